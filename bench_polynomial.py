@@ -0,0 +1,839 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the polynomial expression system.
+Run everything with `python bench_polynomial.py`, or name the benchmarks to run.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from polynomial import (
+    Add,
+    DensePolynomial,
+    Div,
+    EditableExpression,
+    ExpressionArena,
+    ExpressionDAG,
+    ExpressionFile,
+    Int,
+    Mul,
+    Profile,
+    Sub,
+    X,
+    dump,
+    evaluate_parallel,
+    load,
+    newton,
+    parse_lines,
+    simplify_cache,
+)
+
+
+def random_tree(size, seed=0, classes=(X, Int, Add, Mul, Sub)):
+    """Build a balanced random tree of Add/Mul/Sub nodes with `size` leaves"""
+    x_class, int_class = classes[:2]
+    rng = random.Random(seed)
+    nodes = [
+        x_class() if rng.random() < 0.5 else int_class(rng.randint(-9, 9))
+        for _ in range(size)
+    ]
+    while len(nodes) > 1:
+        paired = []
+        for i in range(0, len(nodes) - 1, 2):
+            paired.append(rng.choice(classes[2:])(nodes[i], nodes[i + 1]))
+        if len(nodes) % 2:
+            paired.append(nodes[-1])
+        nodes = paired
+    return nodes[0]
+
+
+def best_of(function, repeat=5):
+    """Return the best wall-clock time of `repeat` calls to `function`"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_compile():
+    """Tree-walking evaluate versus compiled evaluation across tree sizes"""
+    print("=== Compiled evaluation ===")
+    print(f"{'leaves':>8} {'evaluate':>12} {'compiled':>12} {'speedup':>8}")
+    xs = range(-50, 50)
+    for size in [10, 100, 1000, 10000]:
+        tree = random_tree(size)
+        compiled = tree.compile()
+        walk = best_of(lambda: [tree.evaluate(x) for x in xs]) / len(xs)
+        flat = best_of(lambda: [compiled(x) for x in xs]) / len(xs)
+        print(
+            f"{size:>8} {walk * 1e6:>10.1f}us {flat * 1e6:>10.1f}us {walk / flat:>7.1f}x"
+        )
+
+
+def bench_batch():
+    """Per-point compiled evaluation versus evaluate_many over 2*10^5 points"""
+    print("=== Batch evaluation ===")
+    print(f"{'leaves':>8} {'compiled':>12} {'batch':>12} {'speedup':>8}")
+    xs = list(range(-100000, 100000))
+    for size in [10, 100, 1000]:
+        tree = random_tree(size, seed=size)
+        compiled = tree.compile()
+        loop = best_of(lambda: [compiled(x) for x in xs], repeat=1)
+        batch = best_of(lambda: tree.evaluate_many(xs, float64=True), repeat=3)
+        print(
+            f"{size:>8} {loop * 1e3:>10.1f}ms {batch * 1e3:>10.1f}ms {loop / batch:>7.1f}x"
+        )
+
+
+def low_degree_tree(terms, seed=0):
+    """Balanced Add/Sub tree of `terms` terms c * X * ... * X of degree <= 4"""
+    rng = random.Random(seed)
+    nodes = []
+    for _ in range(terms):
+        term = Int(rng.randint(-9, 9))
+        for _ in range(rng.randint(0, 4)):
+            term = Mul(term, X())
+        nodes.append(term)
+    while len(nodes) > 1:
+        paired = []
+        for i in range(0, len(nodes) - 1, 2):
+            paired.append(rng.choice([Add, Sub])(nodes[i], nodes[i + 1]))
+        if len(nodes) % 2:
+            paired.append(nodes[-1])
+        nodes = paired
+    return nodes[0]
+
+
+def bench_horner():
+    """Tree walking versus compiled versus Horner on large low-degree trees"""
+    print("=== Horner evaluation ===")
+    print(f"{'terms':>8} {'evaluate':>12} {'compiled':>12} {'horner':>12}")
+    xs = range(-50, 50)
+    for terms in [10, 100, 1000, 10000]:
+        tree = low_degree_tree(terms)
+        compiled = tree.compile()
+        dense = tree.evaluator()
+        walk = best_of(lambda: [tree.evaluate(x) for x in xs]) / len(xs)
+        flat = best_of(lambda: [compiled(x) for x in xs]) / len(xs)
+        horner = best_of(lambda: [dense(x) for x in xs]) / len(xs)
+        print(
+            f"{terms:>8} {walk * 1e6:>10.1f}us {flat * 1e6:>10.1f}us "
+            f"{horner * 1e6:>10.2f}us"
+        )
+
+
+def shaped_tree(leaves, shape, seed=0):
+    """Left-deep, right-deep or balanced tree whose values stay small at X=1"""
+    rng = random.Random(seed)
+    nodes = [rng.choice([X(), Int(-1), Int(0), Int(1)]) for _ in range(leaves)]
+    if shape == "balanced":
+        # Mul only joins leaves, so products never compound up the tree
+        ops = [Add, Mul, Sub]
+        while len(nodes) > 1:
+            paired = []
+            for i in range(0, len(nodes) - 1, 2):
+                paired.append(rng.choice(ops)(nodes[i], nodes[i + 1]))
+            if len(nodes) % 2:
+                paired.append(nodes[-1])
+            nodes = paired
+            ops = [Add, Sub]
+        return nodes[0]
+    tree = nodes[0]
+    for leaf in nodes[1:]:
+        op = rng.choice([Add, Mul, Sub])
+        tree = op(tree, leaf) if shape == "left" else op(leaf, tree)
+    return tree
+
+
+def _recursive_evaluate(node, x_value):
+    if isinstance(node, X):
+        return x_value
+    if isinstance(node, Int):
+        return node.i
+    left = _recursive_evaluate(node.p1, x_value)
+    right = _recursive_evaluate(node.p2, x_value)
+    if isinstance(node, Add):
+        return left + right
+    if isinstance(node, Mul):
+        return left * right
+    return left - right
+
+
+def bench_traversal():
+    """Explicit-stack repr, evaluate and simplify on deep and balanced trees"""
+    print("=== Traversal (per node) ===")
+    print(
+        f"{'shape':>9} {'nodes':>9} {'repr':>9} {'evaluate':>9} {'simplify':>9} "
+        f"{'recursive':>10}"
+    )
+    for shape in ["left", "right", "balanced"]:
+        for leaves in [1000, 500000]:
+            tree = shaped_tree(leaves, shape)
+            nodes = 2 * leaves - 1
+            timings = [
+                best_of(lambda: repr(tree), repeat=1),
+                best_of(lambda: tree.evaluate(1), repeat=1),
+                best_of(lambda: tree.simplify(), repeat=1),
+            ]
+            try:
+                recursive = best_of(lambda: _recursive_evaluate(tree, 1), repeat=1)
+                recursive = f"{recursive / nodes * 1e6:>8.2f}us"
+            except RecursionError:
+                recursive = "RecursionError"
+            cells = " ".join(f"{t / nodes * 1e6:>7.2f}us" for t in timings)
+            print(f"{shape:>9} {nodes:>9} {cells} {recursive:>10}")
+
+
+def bench_simplify_cache():
+    """Simplifying trees that share a large subtree, with and without the cache"""
+    print("=== Simplify cache ===")
+    base = shaped_tree(100000, "balanced", seed=1)
+    trees = [Add(base, shaped_tree(100, "balanced", seed=i)) for i in range(20)]
+    maxsize = simplify_cache.maxsize
+    for label, size in [("uncached", 0), ("cached", 1 << 20)]:
+        simplify_cache.resize(size)
+        simplify_cache.clear()
+        elapsed = best_of(lambda: [tree.simplify() for tree in trees], repeat=1)
+        print(f"{label:>9}: {elapsed * 1e3:8.1f}ms  {simplify_cache.stats()}")
+    simplify_cache.resize(maxsize)
+    simplify_cache.clear()
+
+
+def bench_incremental():
+    """Full re-evaluation versus incremental after replacing one leaf"""
+    print("=== Incremental re-evaluation ===")
+    xs = list(range(16))
+    for shape in ["balanced", "left"]:
+        tree = shaped_tree(100000, shape, seed=2)
+        handle = EditableExpression(tree, xs)
+        handle.values()
+        leaf = handle.root
+        while leaf.left is not None:
+            leaf = leaf.right if shape == "balanced" else leaf.left
+        compiled = tree.compile()
+        full = best_of(lambda: [compiled(x) for x in xs], repeat=3)
+        start = handle.recomputed
+
+        def edit():
+            nonlocal leaf
+            leaf = handle.replace(leaf, Int(1))
+            handle.values()
+
+        incremental = best_of(edit, repeat=3)
+        path = (handle.recomputed - start) // 3
+        print(
+            f"{shape:>9}: full compiled {full * 1e3:8.2f}ms  "
+            f"incremental {incremental * 1e3:8.3f}ms  ({path} nodes recomputed)"
+        )
+
+
+def bench_cse():
+    """Node counts and evaluation time, per-tree compiled code versus the DAG"""
+    print("=== Common subexpressions ===")
+    corpora = {
+        "low-degree": [low_degree_tree(10000)],
+        "generated": [generated_tree(2000, classes=(X, Int, Add, Sub))],
+        "1000 small": [low_degree_tree(100, seed=i) for i in range(1000)],
+    }
+    xs = range(-50, 50)
+    for label, exprs in corpora.items():
+        dag = ExpressionDAG(exprs)
+        compiled = [expr.compile() for expr in exprs]
+        tree = best_of(lambda: [[c(x) for c in compiled] for x in xs], repeat=3)
+        shared = best_of(lambda: [dag(x) for x in xs], repeat=3)
+        print(
+            f"{label:>10}: {dag.tree_nodes:8d} tree nodes -> {dag.dag_nodes:6d} "
+            f"DAG nodes  compiled {tree * 1e3:7.1f}ms  DAG {shared * 1e3:7.1f}ms"
+        )
+
+
+def bench_parallel():
+    """Expressions x shared X values on 1, 2, 4, ... processes"""
+    print("=== Parallel evaluation ===")
+    exprs = [low_degree_tree(50, seed=i) for i in range(256)]
+    xs = [x % 1000 - 500 for x in range(1 << 16)]
+    processes = [1]
+    while processes[-1] * 2 <= os.cpu_count():
+        processes.append(processes[-1] * 2)
+    serial = None
+    for count in processes:
+        elapsed = best_of(
+            lambda: evaluate_parallel(exprs, xs, processes=count), repeat=1
+        )
+        serial = serial or elapsed
+        print(
+            f"{count:3d} processes: {elapsed:7.2f}s  speedup {serial / elapsed:5.2f}x"
+        )
+
+
+def bench_stream():
+    """repr() versus write_to() for a shared tree with 10^7 characters of text"""
+    print("=== Streaming repr ===")
+    expr = Add(X(), Int(1))
+    for _ in range(19):
+        expr = Mul(expr, Sub(expr, Int(2)))
+    for label, render in [
+        ("repr", lambda out: out.write(repr(expr))),
+        ("write_to", expr.write_to),
+    ]:
+        with open(os.devnull, "w") as out:
+            elapsed = best_of(lambda: render(out), repeat=1)
+            tracemalloc.start()
+            render(out)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print(f"{label:>9}: {elapsed:6.2f}s  peak {peak / 1e6:8.2f}MB")
+
+
+def bench_modular():
+    """evaluate versus modular and multi-modular evaluation as X grows"""
+    print("=== Modular evaluation ===")
+    rng = random.Random(0)
+    # Product of 256 linear factors, degree 256, balanced
+    factors = [Add(X(), Int(rng.randint(-99, 99))) for _ in range(256)]
+    while len(factors) > 1:
+        factors = [Mul(a, b) for a, b in zip(factors[::2], factors[1::2])]
+    tree = factors[0]
+    print(f"{'X bits':>7} {'evaluate':>10} {'mod p':>10} {'residues':>10} {'CRT':>10}")
+    for bits in [64, 256, 1024, 4096]:
+        x = rng.getrandbits(bits)
+        plain = best_of(lambda: tree.evaluate(x), repeat=3)
+        single = best_of(lambda: tree.evaluate_mod(x, 2**61 - 1), repeat=3)
+        value = tree.evaluate_multimod(x)
+        residues = best_of(lambda: tree.evaluate_multimod(x), repeat=3)
+        crt = best_of(value.to_int, repeat=3)
+        assert value.to_int() == tree.evaluate(x).i
+        print(
+            f"{bits:>7} {plain * 1e3:>8.2f}ms {single * 1e3:>8.2f}ms "
+            f"{residues * 1e3:>8.2f}ms {crt * 1e3:>8.2f}ms  "
+            f"({len(value.primes)} primes)"
+        )
+
+
+def bench_multipoint():
+    """Horner at each point versus subproduct trees, exact and modulo a prime"""
+    import polynomial
+
+    print("=== Multipoint evaluation ===")
+    rng = random.Random(0)
+    modulus = 2**31 - 1
+    print(
+        f"{'degree':>7} {'Horner mod p':>13} {'tree mod p':>11} {'exact':>9} {'exact tree':>11}"
+    )
+    for n in [256, 512, 1024, 2048, 4096]:
+        coefficients = [rng.randrange(-100, 100) for _ in range(n)]
+        poly = DensePolynomial(coefficients)
+        xs = [rng.randrange(-(10**6), 10**6) for _ in range(n)]
+        horner = best_of(
+            lambda: [polynomial._horner(coefficients, x, modulus) for x in xs], 1
+        )
+        tree = best_of(lambda: polynomial._multipoint(coefficients, xs, modulus), 1)
+        row = f"{n:>7} {horner:>12.3f}s {tree:>10.3f}s"
+        if n <= 2048:
+            row += f" {best_of(lambda: poly.evaluate_points(xs), 1):>8.3f}s"
+        if n <= 512:
+            row += f" {best_of(lambda: polynomial._multipoint(coefficients, xs), 1):>10.3f}s"
+        print(row)
+
+
+def bench_profile():
+    """evaluate and simplify before, inside and after a Profile block"""
+    print("=== Profiling ===")
+    tree = shaped_tree(100000, "balanced", seed=4)
+
+    def run():
+        simplify_cache.clear()
+        tree.simplify()
+        tree.evaluate(1)
+
+    before = best_of(run, repeat=3)
+    with Profile() as profile:
+        inside = best_of(run, repeat=1)
+    after = best_of(run, repeat=3)
+    print(
+        f"  before {before * 1e3:7.1f}ms  inside {inside * 1e3:7.1f}ms  after {after * 1e3:7.1f}ms"
+    )
+    print(" ", profile.to_json())
+
+
+def bench_server(clients=64, requests=50, points=64):
+    """Load test of the evaluation server: latency percentiles and throughput"""
+    import asyncio
+
+    from polynomial_server import EvaluationServer, request
+
+    print("=== Evaluation server ===")
+    texts = [repr(low_degree_tree(200, seed=i)) for i in range(4)]
+
+    async def client(port, seed, latencies):
+        rng = random.Random(seed)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for _ in range(requests):
+            xs = [rng.randrange(-1000, 1000) for _ in range(points)]
+            start = time.perf_counter()
+            await request(reader, writer, rng.choice(texts), xs)
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    async def load(window):
+        server = EvaluationServer(window=window)
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(client(port, i, latencies) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+        listener.close()
+        await server.wait_closed()
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[len(latencies) * 99 // 100]
+        print(
+            f"window {window * 1e3:4.1f}ms: p50 {p50 * 1e3:6.2f}ms  p99 {p99 * 1e3:6.2f}ms  "
+            f"{len(latencies) / elapsed:7.0f} requests/s  {server.stats()}"
+        )
+
+    for window in [0, 0.001, 0.002, 0.005]:
+        asyncio.run(load(window))
+
+
+def bench_derivative():
+    """Fused value and derivative against two passes, and batched newton()"""
+    print("=== Derivatives ===")
+    for size in [1000, 10000, 100000]:
+        tree = random_tree(size, seed=18)
+        derivative = tree.derivative()
+        compiled, compiled_derivative = tree.compile(), derivative.compile()
+        x = 3
+        two_pass = best_of(lambda: (tree.evaluate(x), derivative.evaluate(x)), 3)
+        fused = best_of(lambda: tree.evaluate_with_derivative(x), 3)
+        compiled_two = best_of(lambda: (compiled(x), compiled_derivative(x)), 3)
+        compiled.value_and_derivative(x)
+        compiled_fused = best_of(lambda: compiled.value_and_derivative(x), 3)
+        print(
+            f"  {size:>6} leaves: tree two-pass {two_pass * 1e3:7.1f}ms  fused {fused * 1e3:7.1f}ms"
+            f"  |  compiled two-pass {compiled_two * 1e3:6.2f}ms  fused {compiled_fused * 1e3:6.2f}ms"
+        )
+    cubic = DensePolynomial([-5, -2, 0, 1]).to_expression()
+    rng = random.Random(18)
+    for points in [100, 10000, 1000000]:
+        x0s = [rng.uniform(-100, 100) for _ in range(points)]
+        elapsed = best_of(lambda: newton(cubic, x0s), 3)
+        roots, converged = newton(cubic, x0s)
+        print(
+            f"  newton on {points:>7} points: {elapsed * 1e3:8.1f}ms"
+            f"  ({points / elapsed:10.0f} points/s, {sum(converged)} converged)"
+        )
+
+
+def bench_divide():
+    """Classical and Newton polynomial division, to tune DIVISION_THRESHOLD"""
+    import polynomial
+
+    print("=== Polynomial division ===")
+    print(f"{'degree':>7} {'classical':>11} {'newton':>11}")
+    rng = random.Random(19)
+    threshold = polynomial.DIVISION_THRESHOLD
+    try:
+        for degree in [16, 32, 64, 128, 256, 512, 1024, 2048]:
+            # quotient and divisor of the same degree, divisor monic
+            b = DensePolynomial([rng.randint(-99, 99) for _ in range(degree)] + [1])
+            q = DensePolynomial([rng.randint(-99, 99) for _ in range(degree + 1)])
+            a = q * b + DensePolynomial([rng.randint(-99, 99) for _ in range(degree)])
+            cells = []
+            for forced in [10**9, 1]:
+                polynomial.DIVISION_THRESHOLD = forced
+                assert divmod(a, b)[0] == q
+                cells.append(best_of(lambda: divmod(a, b), 3))
+            print(f"{degree:>7} " + " ".join(f"{t * 1e3:9.2f}ms" for t in cells))
+    finally:
+        polynomial.DIVISION_THRESHOLD = threshold
+    tree = Div(Mul(Sub(X(), Int(3)), random_tree(400, seed=19)), Sub(X(), Int(3)))
+    simplify_cache.clear()
+    elapsed = best_of(lambda: (simplify_cache.clear(), tree.simplify()), 3)
+    print(f"  simplify of an exact Div over 400 leaves: {elapsed * 1e3:.1f}ms")
+
+
+def bench_exact(points=100000):
+    """Checked int64 evaluate_exact() against exact per-point evaluation"""
+    print("=== Exact evaluation with an int64 fast path ===")
+    rng = random.Random(20)
+    tree = low_degree_tree(200, seed=20)
+    compiled = tree.compile()
+    small = [rng.randint(-20, 20) for _ in range(points)]
+    for overflowing in [0.0, 0.01, 0.1, 1.0]:
+        xs = [x if rng.random() >= overflowing else x * 10**12 for x in small]
+        assert compiled.evaluate_exact(xs) == [compiled(x) for x in xs]
+        per_point = best_of(lambda: [compiled(x) for x in xs], 3)
+        fast = best_of(lambda: compiled.evaluate_exact(xs), 3)
+        print(
+            f"  {overflowing:5.0%} overflowing: per point {per_point * 1e3:7.1f}ms"
+            f"  evaluate_exact {fast * 1e3:7.1f}ms  ({per_point / fast:5.1f}x)"
+        )
+
+
+def bench_multiply():
+    """Schoolbook, Karatsuba and NTT multiplication, to tune the thresholds"""
+    import polynomial
+
+    print("=== Coefficient multiplication ===")
+    print(f"{'length':>7} {'bits':>5} {'schoolbook':>11} {'karatsuba':>11} {'ntt':>11}")
+    rng = random.Random(0)
+    for bits in [4, 256]:
+        for length in [16, 32, 64, 128, 256, 512, 1024, 2048, 4096]:
+            a = [rng.getrandbits(bits) - (1 << bits - 1) for _ in range(length)]
+            b = [rng.getrandbits(bits) - (1 << bits - 1) for _ in range(length)]
+            cells = []
+            primes = polynomial._ntt_primes_needed(a, b)
+            for multiply in [
+                polynomial._schoolbook,
+                polynomial._karatsuba,
+                lambda a, b: polynomial._ntt_multiply(a, b, primes),
+            ]:
+                if multiply is polynomial._schoolbook and length > 2048:
+                    cells.append(f"{'-':>11}")
+                    continue
+                elapsed = best_of(lambda: multiply(a, b), repeat=3)
+                cells.append(f"{elapsed * 1e3:>9.2f}ms")
+            print(f"{length:>7} {bits:>5} " + " ".join(cells))
+
+
+def bench_parse():
+    """Streaming parse rate of a file with one expression per line"""
+    print("=== Parsing ===")
+    for leaves in [4, 16, 64]:
+        lines = [repr(random_tree(leaves, seed=i)) + "\n" for i in range(20000)]
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.writelines(lines)
+        try:
+            with open(f.name) as stream:
+                start = time.perf_counter()
+                count = sum(1 for _ in parse_lines(stream))
+                elapsed = time.perf_counter() - start
+        finally:
+            os.unlink(f.name)
+        chars = sum(map(len, lines)) / len(lines)
+        print(
+            f"{leaves:>4} leaves ({chars:5.1f} chars/line): "
+            f"{count / elapsed:>9.0f} lines/s"
+        )
+
+
+def bench_serialize():
+    """Binary format versus pickle for a corpus of expressions"""
+    print("=== Serialization ===")
+    corpus = [generated_tree(4, seed=i) for i in range(50000)]
+    with tempfile.TemporaryDirectory() as directory:
+        pickled = os.path.join(directory, "corpus.pickle")
+        binary = os.path.join(directory, "corpus.ply")
+        start = time.perf_counter()
+        with open(pickled, "wb") as f:
+            pickle.dump(corpus, f)
+        pickle_dump = time.perf_counter() - start
+        start = time.perf_counter()
+        with open(binary, "wb") as f:
+            dump(corpus, f)
+        binary_dump = time.perf_counter() - start
+        # A whole-corpus pickle shares subtrees across expressions, while
+        # per-expression pickles and binary records only share within one
+        separate = sum(len(pickle.dumps(expr)) for expr in corpus)
+        print(
+            f"size: pickle {os.path.getsize(pickled) / len(corpus):.1f} B/expr "
+            f"(whole corpus), {separate / len(corpus):.1f} B/expr (each), "
+            f"binary {os.path.getsize(binary) / len(corpus):.1f} B/expr"
+        )
+        print(f"dump: pickle {pickle_dump:.2f}s, binary {binary_dump:.2f}s")
+
+        def pickle_evaluate():
+            with open(pickled, "rb") as f:
+                return [expr.evaluate(3) for expr in pickle.load(f)]
+
+        def binary_evaluate():
+            with open(binary, "rb") as f:
+                return [expr.evaluate(3) for expr in load(f)]
+
+        def mapped_evaluate():
+            with ExpressionFile(binary) as mapped:
+                return mapped.evaluate_all(3)
+
+        for label, function in [
+            ("pickle load + evaluate", pickle_evaluate),
+            ("binary load + evaluate", binary_evaluate),
+            ("mapped evaluate", mapped_evaluate),
+        ]:
+            print(f"{label:>23}: {best_of(function, repeat=1):.2f}s")
+
+
+class _PlainX:
+    pass
+
+
+class _PlainInt:
+    def __init__(self, i):
+        self.i = i
+
+
+class _PlainBinary:
+    def __init__(self, p1, p2):
+        self.p1 = p1
+        self.p2 = p2
+
+
+def generated_tree(size, seed=0, classes=(X, Int, Add, Mul, Sub)):
+    """Balanced tree whose `size` leaves are freshly built copies of 100 terms"""
+    rng = random.Random(seed)
+    nodes = [random_tree(8, rng.randrange(100), classes) for _ in range(size)]
+    while len(nodes) > 1:
+        paired = []
+        for i in range(0, len(nodes) - 1, 2):
+            paired.append(rng.choice(classes[2:])(nodes[i], nodes[i + 1]))
+        if len(nodes) % 2:
+            paired.append(nodes[-1])
+        nodes = paired
+    return nodes[0]
+
+
+def bench_memory():
+    """Memory per node of 10^6-node trees, plain __dict__ objects versus interned"""
+    print("=== Memory per node ===")
+    for shape, build, size in [
+        ("random", random_tree, 500000),  # 2 * size - 1 nodes
+        ("generated", generated_tree, 33333),  # terms of 15 nodes each
+    ]:
+        nodes = 2 * size - 1 if shape == "random" else 16 * size - 1
+        for label, classes in [
+            ("plain", (_PlainX, _PlainInt, _PlainBinary)),
+            ("interned", (X, Int, Add, Mul, Sub)),
+        ]:
+            tracemalloc.start()
+            tree = build(size, seed=1, classes=classes)
+            used = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print(f"{shape:>9} {label:>9}: {used / nodes:6.1f} bytes/node")
+            del tree
+
+
+def bench_arena(size=500000):
+    """Bytes per node and evaluate/simplify times, node objects versus arena"""
+    import polynomial
+
+    print("=== Expression arena ===")
+    nodes = 2 * size - 1
+    tracemalloc.start()
+    tree = random_tree(size, seed=22)
+    objects = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    arena = ExpressionArena()
+    tracemalloc.start()
+    root = random_tree(
+        size,
+        seed=22,
+        classes=(arena.x, arena.constant, arena.add, arena.mul, arena.sub),
+    )
+    columns = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert arena.expression(root) is tree
+    # Both store each distinct node once (the arena shares only X), so
+    # compare per stored node
+    distinct = sum(1 for _ in polynomial._postorder(tree))
+    print(
+        f"  {nodes} tree nodes: objects {objects / distinct:6.1f} bytes per node "
+        f"({distinct} distinct), arena {columns / len(arena):5.1f} "
+        f"({len(arena)} nodes, {arena.bytes_per_node:.0f} in full columns)"
+    )
+
+    def cold_simplify():
+        simplify_cache.clear()
+        tree.simplify()
+
+    for label, objects_run, arena_run in [
+        ("evaluate", lambda: tree.evaluate(1), lambda: arena.evaluate(root, 1)),
+        ("simplify", cold_simplify, lambda: arena.simplify(root)),
+    ]:
+        print(
+            f"  {label}: objects {best_of(objects_run, 3) * 1e3:7.1f}ms"
+            f"  arena {best_of(arena_run, 3) * 1e3:7.1f}ms"
+        )
+
+
+def generate_tree(leaves, shape, seed=0):
+    """Seeded random, left-deep, right-deep or balanced tree over all six
+    node classes. Values at X=1 are tracked while building, so Div never
+    divides by zero there and Mul keeps every value below 2**16."""
+    rng = random.Random(seed)
+    nodes = []
+    for _ in range(leaves):
+        if rng.random() < 0.3:
+            nodes.append((X(), 1))
+        else:
+            c = rng.randint(-3, 3)
+            nodes.append((Int(c), c))
+
+    def join(left, right):
+        (p1, a), (p2, b) = left, right
+        choices = [(Add, a + b), (Sub, a - b)]
+        if abs(a * b) < 2**16:
+            choices.append((Mul, a * b))
+        if b:
+            choices.append((Div, a // b))
+        cls, value = rng.choice(choices)
+        return cls(p1, p2), value
+
+    if shape == "balanced":
+        while len(nodes) > 1:
+            paired = [join(nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+            if len(nodes) % 2:
+                paired.append(nodes[-1])
+            nodes = paired
+    elif shape == "random":
+        # Join two nodes drawn at random until one is left
+        while len(nodes) > 1:
+            i = rng.randrange(len(nodes))
+            nodes[i], nodes[-1] = nodes[-1], nodes[i]
+            left = nodes.pop()
+            j = rng.randrange(len(nodes))
+            nodes[j], nodes[-1] = nodes[-1], nodes[j]
+            nodes.append(join(left, nodes.pop()))
+    else:
+        tree = nodes[0]
+        for leaf in nodes[1:]:
+            tree = join(tree, leaf) if shape == "left" else join(leaf, tree)
+        nodes = [tree]
+    return nodes[0][0]
+
+
+def measure_import(repeat=5):
+    """Best time to import polynomial in a fresh interpreter"""
+    script = (
+        "import time; start = time.perf_counter(); import polynomial; "
+        "print(time.perf_counter() - start)"
+    )
+    directory = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        times.append(float(output.split()[-1]))
+    return min(times)
+
+
+SUITE_SEED = 21
+
+
+def bench_suite(sizes=(1000, 10000, 100000)):
+    """Construction, repr, evaluate and simplify on seeded trees of every
+    shape, plus import time; returns the results for --json"""
+    import polynomial
+
+    print("=== Suite ===")
+    results = {
+        "python": sys.version.split()[0],
+        "numpy": polynomial.np is not None,
+        "seed": SUITE_SEED,
+        "import": measure_import(),
+        "trees": {},
+    }
+    print(f"  import polynomial: {results['import'] * 1e3:.1f}ms")
+    print(
+        f"  {'tree':>15} {'construct':>11} {'repr':>11} {'evaluate':>11} {'simplify':>11}"
+    )
+    for shape in ["random", "left", "right", "balanced"]:
+        for size in sizes:
+            construct = best_of(lambda: generate_tree(size, shape, SUITE_SEED), 3)
+            tree = generate_tree(size, shape, SUITE_SEED)
+
+            def cold_simplify():
+                simplify_cache.clear()
+                tree.simplify()
+
+            timings = {
+                "construct": construct,
+                "repr": best_of(lambda: repr(tree), 3),
+                "evaluate": best_of(lambda: tree.evaluate(1), 3),
+                "simplify": best_of(cold_simplify, 3),
+            }
+            name = f"{shape}/{size}"
+            results["trees"][name] = timings
+            print(
+                f"  {name:>15} "
+                + " ".join(f"{t * 1e3:>9.1f}ms" for t in timings.values())
+            )
+    return results
+
+
+def compare_results(baseline, results):
+    """Print each suite timing against the same entry of an earlier run"""
+    print("=== Suite against the baseline ===")
+    pairs = [("import", baseline.get("import"), results["import"])]
+    for name, timings in results["trees"].items():
+        old = baseline.get("trees", {}).get(name, {})
+        pairs += [(f"{name} {k}", old.get(k), t) for k, t in timings.items()]
+    for name, old, new in pairs:
+        if old:
+            print(
+                f"  {name:>26}: {old * 1e3:9.2f}ms -> {new * 1e3:9.2f}ms  {new / old:5.2f}x"
+            )
+
+
+BENCHMARKS = {
+    "compile": bench_compile,
+    "batch": bench_batch,
+    "memory": bench_memory,
+    "arena": bench_arena,
+    "horner": bench_horner,
+    "traversal": bench_traversal,
+    "simplify-cache": bench_simplify_cache,
+    "incremental": bench_incremental,
+    "cse": bench_cse,
+    "parallel": bench_parallel,
+    "stream": bench_stream,
+    "modular": bench_modular,
+    "multipoint": bench_multipoint,
+    "profile": bench_profile,
+    "server": bench_server,
+    "derivative": bench_derivative,
+    "exact": bench_exact,
+    "multiply": bench_multiply,
+    "divide": bench_divide,
+    "parse": bench_parse,
+    "serialize": bench_serialize,
+    "suite": bench_suite,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run, default all")
+    parser.add_argument(
+        "--json", metavar="PATH", help="save the results of the suite benchmark"
+    )
+    parser.add_argument(
+        "--compare", metavar="PATH", help="compare the suite with an earlier --json"
+    )
+    args = parser.parse_args()
+    results = {}
+    for name in args.names or list(BENCHMARKS):
+        result = BENCHMARKS[name]()
+        if result is not None:
+            results[name] = result
+    if args.compare and "suite" in results:
+        with open(args.compare) as f:
+            compare_results(json.load(f)["suite"], results["suite"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -1,171 +1,2818 @@
-class X:
-    def __init__(self):
-        pass
+import io
+import json
+import mmap
+import operator
+import os
+import re
+import time
+import weakref
+from array import array
+from collections import Counter, OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, batch evaluation falls back to Python
+    np = None
+
+
+# Every live node keyed by its class and children, so that structurally equal
+# nodes are the same object and shared subtrees turn trees into DAGs.
+# A plain dict of weak references is used rather than WeakValueDictionary,
+# whose pure-Python lookups would dominate node construction.
+_interned = {}
+
+
+class _NodeRef(weakref.ref):
+    __slots__ = ("key",)
+
+
+def _forget(ref):
+    if _interned.get(ref.key) is ref:
+        del _interned[ref.key]
+
+
+def _register(node, key):
+    node._hash = hash(key)
+    ref = _NodeRef(node, _forget)
+    ref.key = key
+    _interned[key] = ref
+    return node
+
+
+def _intern_pair(cls, p1, p2):
+    key = (cls, p1, p2)
+    ref = _interned.get(key)
+    if ref is not None:
+        node = ref()
+        if node is not None:
+            return node
+    node = object.__new__(cls)
+    node.p1 = p1
+    node.p2 = p2
+    return _register(node, key)
+
+
+class Expression:
+    # Nodes are interned and immutable: equality is identity and the
+    # structural hash is computed once, from the children's cached hashes.
+    __slots__ = ("_hash", "__weakref__")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return self is other
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+    def repr_chunks(self):
+        """Yield the text of repr(self) in small pieces, without joining them."""
+        return _repr_chunks(self)
+
+    def write_to(self, stream, buffer_size=1 << 16):
+        """Write repr(self) to stream and return the number of characters.
+
+        Pieces are joined into writes of about buffer_size characters, so
+        memory stays bounded by the buffer plus a stack as deep as the tree.
+        Binary streams receive the text encoded as ASCII.
+        """
+        binary = isinstance(stream, (io.RawIOBase, io.BufferedIOBase))
+        buffered = []
+        pending = written = 0
+        for chunk in _repr_chunks(self):
+            buffered.append(chunk)
+            pending += len(chunk)
+            if pending >= buffer_size:
+                text = "".join(buffered)
+                stream.write(text.encode("ascii") if binary else text)
+                written += pending
+                buffered.clear()
+                pending = 0
+        text = "".join(buffered)
+        stream.write(text.encode("ascii") if binary else text)
+        return written + pending
+
+    def compile(self):
+        """Flatten this tree into a CompiledExpression for repeated evaluation."""
+        return CompiledExpression(self)
+
+    def evaluate_with_derivative(self, x_value):
+        """Return (value, derivative) at x_value as Ints, in one pass.
+
+        The result equals (evaluate(x_value), derivative().evaluate(x_value))
+        without building the derivative tree.
+        """
+        value, slope = _evaluate_dual(self, x_value)
+        return Int(value), Int(slope)
+
+    def evaluate_many(self, xs, float64=False, chunk_size=None, out=None):
+        """Evaluate at every value of xs with one array operation per node.
+
+        Values are int64 (Div floors like //) or float64, processed chunk_size
+        at a time, so xs and out may be memory-mapped arrays larger than RAM.
+        Without numpy this falls back to a Python loop returning a list.
+        """
+        return _evaluate_many(to_postfix(self), xs, float64, chunk_size, out)
+
+    def evaluate_exact(self, xs, chunk_size=None):
+        """Evaluate at every value of xs exactly, returning a list of ints.
+
+        Values run as int64 arrays with every operation checked for
+        overflow; only the X values that overflow are evaluated again with
+        Python ints, so the result always equals evaluate() at each x.
+        X values that are not integers raise TypeError.
+        """
+        return _evaluate_exact(to_postfix(self), xs, chunk_size)
+
+    def evaluate_mod(self, x_value, modulus):
+        """Return the value at x_value reduced modulo modulus, in [0, modulus).
+
+        Every intermediate stays below modulus**2. Div is exact division,
+        i.e. multiplication by the inverse of the divisor modulo modulus,
+        which agrees with // whenever the division is exact; a divisor with
+        no inverse raises ZeroDivisionError.
+        """
+        code, outputs, _ = _dag_code([self])
+        return _evaluate_residue(code, x_value, modulus)[outputs[0]]
+
+    def evaluate_multimod(self, x_value, primes=None):
+        """Evaluate modulo several word-sized primes and return a ModularValue.
+
+        By default enough primes are taken that ModularValue.to_int()
+        rebuilds the exact value by CRT; Div follows evaluate_mod().
+        """
+        code, outputs, _ = _dag_code([self])
+        if primes is None:
+            bits = _bit_bound(code, x_value)[outputs[0]]
+            primes = _modular_primes(bits // (MODULAR_PRIME_BITS - 1) + 1)
+        residues = _evaluate_residues(code, x_value, primes)[outputs[0]]
+        if np is not None:
+            residues = residues.tolist()
+        return ModularValue(primes, residues)
+
+    def to_coefficients(self, sparse=False):
+        """Return the coefficients of this polynomial in X, lowest power first.
+
+        With sparse=True the result is a {power: coefficient} dict of the
+        nonzero terms. Raises NotPolynomialError when a Div does not divide
+        exactly into a polynomial.
+        """
+        coefficients = _coefficients(self)
+        if sparse:
+            return {power: c for power, c in enumerate(coefficients) if c}
+        return coefficients
+
+    def evaluator(self):
+        """Return the cheapest evaluator for repeated calls on this tree.
+
+        That is Horner's rule on the canonical form, or compiled code when a
+        Div keeps the expression from being a polynomial.
+        """
+        try:
+            return DensePolynomial(self.to_coefficients())
+        except NotPolynomialError:
+            return self.compile()
+
+
+class X(Expression):
+    __slots__ = ()
+
+    def __new__(cls):
+        key = (cls,)
+        ref = _interned.get(key)
+        if ref is not None:
+            node = ref()
+            if node is not None:
+                return node
+        return _register(object.__new__(cls), key)
 
     def __repr__(self):
         return "X"
 
     def evaluate(self, x_value):
-        # TODO: Implement evaluation for variable X
-        # Should return an Int object with the given x_value
-        pass
+        return Int(x_value)
 
     def simplify(self):
-        # TODO (Optional Exercise): Implement simplification
-        # X cannot be simplified further, so return self
-        pass
+        return self
+
+    def derivative(self):
+        return Int(1)
 
 
-class Int:
-    def __init__(self, i):
-        self.i = i
+class Int(Expression):
+    __slots__ = ("i",)
+
+    def __new__(cls, i):
+        key = (cls, type(i), i)
+        ref = _interned.get(key)
+        if ref is not None:
+            node = ref()
+            if node is not None:
+                return node
+        node = object.__new__(cls)
+        node.i = i
+        return _register(node, key)
 
     def __repr__(self):
         return str(self.i)
 
     def evaluate(self, x_value):
-        # TODO: Implement evaluation for integer constant
-        # Should return an Int object with the stored integer value
-        pass
+        return self
 
     def simplify(self):
-        # TODO (Optional Exercise): Implement simplification
-        # Integer constants cannot be simplified further, so return self
-        pass
+        return self
+
+    def derivative(self):
+        return Int(0)
+
 
+class Add(Expression):
+    __slots__ = ("p1", "p2")
 
-class Add:
-    def __init__(self, p1, p2):
-        self.p1 = p1
-        self.p2 = p2
+    def __new__(cls, p1, p2):
+        return _intern_pair(cls, p1, p2)
 
     def __repr__(self):
-        return repr(self.p1) + " + " + repr(self.p2)
+        return "".join(_repr_chunks(self))
 
     def evaluate(self, x_value):
-        # TODO: Implement evaluation for addition
-        # Should evaluate both operands and return their sum
-        pass
+        return Int(_evaluate(self, x_value))
 
     def simplify(self):
-        # TODO (Optional Exercise): Implement simplification
-        # Examples: X + 0 -> X, 0 + X -> X, 3 + 5 -> 8
-        # Hint: Simplify operands first, then apply simplification rules
-        pass
+        return _simplify(self)
 
+    def derivative(self):
+        return _derivative(self)
 
-class Mul:
-    def __init__(self, p1, p2):
-        self.p1 = p1
-        self.p2 = p2
+
+class Mul(Expression):
+    __slots__ = ("p1", "p2")
+
+    def __new__(cls, p1, p2):
+        return _intern_pair(cls, p1, p2)
 
     def __repr__(self):
-        if isinstance(self.p1, Add):
-            if isinstance(self.p2, Add):
-                return "( " + repr(self.p1) + " ) * ( " + repr(self.p2) + " )"
-            return "( " + repr(self.p1) + " ) * " + repr(self.p2)
-        if isinstance(self.p2, Add):
-            return repr(self.p1) + " * ( " + repr(self.p2) + " )"
-        return repr(self.p1) + " * " + repr(self.p2)
+        return "".join(_repr_chunks(self))
 
     def evaluate(self, x_value):
-        # TODO: Implement evaluation for multiplication
-        # Should evaluate both operands and return their product
-        pass
+        return Int(_evaluate(self, x_value))
 
     def simplify(self):
-        # TODO (Optional Exercise): Implement simplification
-        # Examples: X * 0 -> 0, X * 1 -> X, 3 * 5 -> 15
-        # Hint: Simplify operands first, then apply simplification rules
-        pass
+        return _simplify(self)
+
+    def derivative(self):
+        return _derivative(self)
 
 
-class Sub:
-    def __init__(self, p1, p2):
-        self.p1 = p1
-        self.p2 = p2
+class Sub(Expression):
+    __slots__ = ("p1", "p2")
+
+    def __new__(cls, p1, p2):
+        return _intern_pair(cls, p1, p2)
 
     def __repr__(self):
-        # TODO: Implement string representation for subtraction
-        # Should handle parentheses similar to Mul class
-        # Hint: Look at how Mul class handles parentheses
-        pass
+        return "".join(_repr_chunks(self))
 
     def evaluate(self, x_value):
-        # TODO: Implement evaluation for subtraction
-        # Should return the difference of the two operands
-        pass
+        return Int(_evaluate(self, x_value))
 
     def simplify(self):
-        # TODO (Optional Exercise): Implement simplification
-        # Examples: X - 0 -> X, 5 - 3 -> 2
-        # Hint: Simplify operands first, then apply simplification rules
-        pass
+        return _simplify(self)
+
+    def derivative(self):
+        return _derivative(self)
+
 
+class Div(Expression):
+    __slots__ = ("p1", "p2")
 
-class Div:
-    def __init__(self, p1, p2):
-        self.p1 = p1
-        self.p2 = p2
+    def __new__(cls, p1, p2):
+        return _intern_pair(cls, p1, p2)
 
     def __repr__(self):
-        # TODO: Implement string representation for division
-        # Should handle parentheses similar to Mul class
-        # Hint: Look at how Mul class handles parentheses
-        pass
+        return "".join(_repr_chunks(self))
 
     def evaluate(self, x_value):
-        # TODO: Implement evaluation for division
-        # Should return the quotient of the two operands (use integer division //)
-        pass
+        return Int(_evaluate(self, x_value))
 
     def simplify(self):
-        # TODO (Optional Exercise): Implement simplification
-        # Examples: X / 1 -> X, 6 / 2 -> 3
-        # Hint: Simplify operands first, then apply simplification rules
-        pass
+        return _simplify(self)
 
+    def derivative(self):
+        return _derivative(self)
 
-# Original polynomial example
-poly = Add(Add(Int(4), Int(3)), Add(X(), Mul(Int(1), Add(Mul(X(), X()), Int(1)))))
-print("Original polynomial:", poly)
 
-# Test new Sub and Div classes (will fail until implemented)
-print("\n--- Testing Sub and Div classes ---")
-try:
-    sub_poly = Sub(Int(10), Int(3))
-    print("Subtraction:", sub_poly)
-except Exception as e:
-    print("❌ Subtraction test failed - Sub class not implemented yet")
+# Operator text of each binary class, and the operand classes it prints in
+# parentheses on its left and right so the text keeps the tree's grouping
+_SYMBOLS = {Add: " + ", Mul: " * ", Sub: " - ", Div: " / "}
+_PARENTHESIZED = {
+    Add: ((), ()),
+    Mul: ((Add, Sub), (Add, Sub, Mul, Div)),
+    Sub: ((Add, Sub), (Add, Sub)),
+    Div: ((Add, Sub), (Add, Sub, Mul, Div)),
+}
 
-try:
-    div_poly = Div(Int(15), Int(3))
-    print("Division:", div_poly)
-except Exception as e:
-    print("❌ Division test failed - Div class not implemented yet")
+_APPLY = {
+    Add: operator.add,
+    Mul: operator.mul,
+    Sub: operator.sub,
+    Div: operator.floordiv,
+}
 
-# Test evaluation (will fail until implemented)
-print("\n--- Testing evaluation ---")
-try:
-    simple_poly = Add(Sub(Mul(Int(2), X()), Int(1)), Div(Int(6), Int(2)))
-    print("Test polynomial:", simple_poly)
-    result = simple_poly.evaluate(4)
-    print(f"Evaluation for X=4: {result}")
-except Exception as e:
-    print("❌ Evaluation test failed - evaluate methods not implemented yet")
 
-try:
-    original_result = poly.evaluate(2)
-    print(f"Original polynomial evaluation for X=2: {original_result}")
-except Exception as e:
-    print(
-        "❌ Original polynomial evaluation failed - evaluate methods not implemented yet"
+def _repr_chunks(expr):
+    """Yield the text of expr piece by piece, using an explicit stack."""
+    stack = [expr]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+        elif isinstance(item, X):
+            yield "X"
+        elif isinstance(item, Int):
+            yield str(item.i)
+        elif not isinstance(item, Expression):
+            yield repr(item)
+        else:
+            left, right = _PARENTHESIZED[type(item)]
+            if isinstance(item.p2, right):
+                stack += [" )", item.p2, "( "]
+            else:
+                stack.append(item.p2)
+            stack.append(_SYMBOLS[type(item)])
+            if isinstance(item.p1, left):
+                stack += [" )", item.p1, "( "]
+            else:
+                stack.append(item.p1)
+
+
+def _evaluate(expr, x_value):
+    # Operands and pending operators share one explicit stack; plain ints
+    # are computed per node and only the final result is wrapped in an Int.
+    values = []
+    stack = [expr]
+    while stack:
+        item = stack.pop()
+        cls = type(item)
+        if cls is X:
+            values.append(x_value)
+        elif cls is Int:
+            values.append(item.i)
+        elif cls in _APPLY:
+            stack += (_APPLY[cls], item.p2, item.p1)
+        else:
+            right = values.pop()
+            values[-1] = item(values[-1], right)
+    return values[0]
+
+
+def _is_constant(node, value):
+    return isinstance(node, Int) and node.i == value
+
+
+def _simplify_node(node, p1, p2, sizes=None):
+    """Apply the local rules to node, given its already simplified operands.
+
+    sizes is the operand size table of _division_size(), shared by the
+    nodes of one simplify call.
+    """
+    cls = type(node)
+    constant = isinstance(p1, Int) and isinstance(p2, Int)
+    if cls is Add:
+        # X + 0 -> X, 0 + X -> X, 3 + 5 -> 8
+        if constant:
+            return Int(p1.i + p2.i)
+        if _is_constant(p1, 0):
+            return p2
+        if _is_constant(p2, 0):
+            return p1
+    elif cls is Mul:
+        # X * 0 -> 0, X * 1 -> X, 3 * 5 -> 15
+        if constant:
+            return Int(p1.i * p2.i)
+        if _is_constant(p1, 0) or _is_constant(p2, 0):
+            return Int(0)
+        if _is_constant(p1, 1):
+            return p2
+        if _is_constant(p2, 1):
+            return p1
+    elif cls is Sub:
+        # X - 0 -> X, 5 - 3 -> 2, X - X -> 0
+        if constant:
+            return Int(p1.i - p2.i)
+        if _is_constant(p2, 0):
+            return p1
+        if p1 is p2:
+            return Int(0)
+    elif cls is Div:
+        # X / 1 -> X, 6 / 2 -> 3, (4 * X) / 2 -> 2 * X,
+        # (X * X - 1) / (X + 1) -> X - 1; division by zero is left to evaluate
+        if constant and p2.i:
+            return Int(p1.i // p2.i)
+        if _is_constant(p2, 1):
+            return p1
+        quotient = _exact_quotient(p1, p2, sizes)
+        if quotient is not None:
+            return quotient
+    if p1 is node.p1 and p2 is node.p2:
+        return node
+    return cls(p1, p2)
+
+
+class SimplifyCache:
+    """A bounded LRU map from nodes to their simplified form.
+
+    Nodes are interned, so a node stands for its structure and a subtree
+    simplified by any earlier call is looked up instead of reduced again.
+    """
+
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, node):
+        result = self._results.get(node)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._results.move_to_end(node)
+        return result
+
+    def put(self, node, result):
+        if self.maxsize <= 0:
+            return
+        self._results[node] = result
+        self._results.move_to_end(node)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self._results) > max(maxsize, 0):
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self._results.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._results),
+            "maxsize": self.maxsize,
+        }
+
+
+# Shared by every simplify() call; resize() or clear() it to tune
+simplify_cache = SimplifyCache()
+
+# Marks where a node's simplified operands are ready on the results stack
+_COMBINE = object()
+
+
+def _simplify(expr, cache=None):
+    cache = simplify_cache if cache is None else cache
+    sizes = {}
+    results = []
+    stack = [expr]
+    while stack:
+        item = stack.pop()
+        if item is _COMBINE:
+            node = stack.pop()
+            p2 = results.pop()
+            result = _simplify_node(node, results[-1], p2, sizes)
+            results[-1] = result
+            cache.put(node, result)
+            if result is not node and not isinstance(result, (X, Int)):
+                cache.put(result, result)
+        elif isinstance(item, (X, Int)):
+            results.append(item)
+        else:
+            result = cache.get(item)
+            if result is None:
+                stack += (item, _COMBINE, item.p2, item.p1)
+            else:
+                results.append(result)
+    return results[0]
+
+
+# Opcodes of the flat postfix form produced by to_postfix()
+OP_X, OP_INT, OP_ADD, OP_MUL, OP_SUB, OP_DIV = range(6)
+
+_OPCODES = {Add: OP_ADD, Mul: OP_MUL, Sub: OP_SUB, Div: OP_DIV}
+_CLASSES = {opcode: cls for cls, opcode in _OPCODES.items()}
+_APPLY_OPCODE = {opcode: _APPLY[cls] for cls, opcode in _OPCODES.items()}
+_OPERATORS = {OP_ADD: "+", OP_MUL: "*", OP_SUB: "-", OP_DIV: "//"}
+
+
+def to_postfix(expr):
+    """Flatten an expression tree into a list of (opcode, operand) pairs."""
+    code = []
+    stack = [(expr, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, X):
+            code.append((OP_X, None))
+        elif isinstance(node, Int):
+            code.append((OP_INT, node.i))
+        elif expanded:
+            code.append((_OPCODES[type(node)], None))
+        else:
+            stack.append((node, True))
+            stack.append((node.p2, False))
+            stack.append((node.p1, False))
+    return code
+
+
+def _generate_function(code):
+    # Emit straight-line Python with one local per stack slot, so the
+    # generated function has no nesting limit and allocates no wrappers.
+    namespace = {}
+    lines = []
+    names = []
+    for opcode, operand in code:
+        if opcode == OP_X:
+            names.append("x")
+        elif opcode == OP_INT:
+            if type(operand) is int and abs(operand) < 2**63:
+                names.append("(%d)" % operand)
+            else:
+                name = "k%d" % len(namespace)
+                namespace[name] = operand
+                names.append(name)
+        else:
+            right = names.pop()
+            left = names.pop()
+            slot = "s%d" % len(names)
+            lines.append("    %s = %s %s %s" % (slot, left, _OPERATORS[opcode], right))
+            names.append(slot)
+    lines.append("    return " + names.pop())
+    exec("def _compiled(x):\n" + "\n".join(lines), namespace)
+    return namespace["_compiled"]
+
+
+class CompiledExpression:
+    """An expression flattened to postfix code and a generated Python function."""
+
+    def __init__(self, expr):
+        self.code = to_postfix(expr)
+        self.function = _generate_function(self.code)
+        self._dual = None
+
+    def __call__(self, x_value):
+        return self.function(x_value)
+
+    def evaluate(self, x_value):
+        return Int(self.function(x_value))
+
+    def value_and_derivative(self, x_value):
+        """Return the value and derivative at x_value as ints, in one pass."""
+        if self._dual is None:
+            self._dual = _generate_dual_function(self.code)
+        return self._dual(x_value)
+
+    def evaluate_many(self, xs, float64=False, chunk_size=None, out=None):
+        return _evaluate_many(self.code, xs, float64, chunk_size, out)
+
+    def evaluate_exact(self, xs, chunk_size=None):
+        return _evaluate_exact(self.code, xs, chunk_size, self.function)
+
+
+class ExpressionDAG:
+    """Several expressions flattened into one DAG of distinct subtrees.
+
+    Interning already merges structurally identical subtrees into one node,
+    so this pass numbers each distinct node once across all the expressions.
+    code holds (opcode, operand) instructions whose binary operands are the
+    indices of earlier instructions; outputs holds the index of each
+    expression. Evaluation computes every distinct subtree once per X value.
+    """
+
+    def __init__(self, exprs):
+        self.code, self.outputs, self.tree_nodes = _dag_code(exprs)
+        self.function = _generate_dag_function(self.code, self.outputs)
+
+    @property
+    def dag_nodes(self):
+        return len(self.code)
+
+    def __len__(self):
+        return len(self.outputs)
+
+    def __call__(self, x_value):
+        """Return the value of every expression at x_value as a list of ints."""
+        return self.function(x_value)
+
+    def evaluate(self, x_value):
+        return [Int(value) for value in self.function(x_value)]
+
+    def evaluate_many(self, xs, float64=False, chunk_size=None):
+        """Evaluate every expression at every value of xs.
+
+        Returns an array of shape (len(self), len(xs)), int64 or float64,
+        or a list of lists without numpy.
+        """
+        if np is None:
+            convert = float if float64 else int
+            rows = [self.function(convert(x)) for x in xs]
+            return [list(column) for column in zip(*rows)] or [[] for _ in self.outputs]
+        dtype = np.float64 if float64 else np.int64
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        xs = np.asarray(xs)
+        out = np.empty((len(self.outputs), len(xs)), dtype)
+        for start in range(0, len(xs), chunk_size):
+            chunk = xs[start : start + chunk_size].astype(dtype, copy=False)
+            out[:, start : start + chunk_size] = _evaluate_dag_chunk(
+                self.code, self.outputs, chunk
+            )
+        return out
+
+
+def _dag_code(exprs):
+    """Number each distinct node of exprs once: return (code, outputs, tree nodes)."""
+    code = []
+    outputs = []
+    tree_nodes = 0
+    index = {}
+    sizes = {}
+    seen = set()
+    for expr in exprs:
+        for node in _postorder(expr, seen):
+            index[node] = len(code)
+            if isinstance(node, X):
+                code.append((OP_X, None))
+                sizes[node] = 1
+            elif isinstance(node, Int):
+                code.append((OP_INT, node.i))
+                sizes[node] = 1
+            else:
+                operands = (index[node.p1], index[node.p2])
+                code.append((_OPCODES[type(node)], operands))
+                sizes[node] = 1 + sizes[node.p1] + sizes[node.p2]
+        outputs.append(index[expr])
+        tree_nodes += sizes[expr]
+    return code, outputs, tree_nodes
+
+
+def _last_uses(code, outputs):
+    last = {}
+    for i, (opcode, operand) in enumerate(code):
+        if opcode not in (OP_X, OP_INT):
+            last[operand[0]] = last[operand[1]] = i
+    for i in outputs:
+        last[i] = len(code)
+    return last
+
+
+def _generate_dag_function(code, outputs):
+    # Every distinct subtree is assigned once; a register is reused as soon
+    # as the last instruction reading it has run, keeping the locals few.
+    namespace = {}
+    lines = []
+    names = {}
+    free = []
+    registers = 0
+    last = _last_uses(code, outputs)
+    for i, (opcode, operand) in enumerate(code):
+        if opcode == OP_X:
+            names[i] = "x"
+        elif opcode == OP_INT:
+            if type(operand) is int and abs(operand) < 2**63:
+                names[i] = "(%d)" % operand
+            else:
+                names[i] = "k%d" % len(namespace)
+                namespace[names[i]] = operand
+        else:
+            left, right = operand
+            expression = "%s %s %s" % (names[left], _OPERATORS[opcode], names[right])
+            for j in {left, right}:
+                if last[j] == i and names[j].startswith("r"):
+                    free.append(names[j])
+            if free:
+                names[i] = free.pop()
+            else:
+                names[i] = "r%d" % registers
+                registers += 1
+            lines.append("    %s = %s" % (names[i], expression))
+    lines.append("    return [%s]" % ", ".join(names[i] for i in outputs))
+    exec("def _dag(x):\n" + "\n".join(lines), namespace)
+    return namespace["_dag"]
+
+
+def _evaluate_dag_chunk(code, outputs, xs):
+    last = _last_uses(code, outputs)
+    values = {}
+    for i, (opcode, operand) in enumerate(code):
+        if opcode == OP_X:
+            values[i] = xs
+        elif opcode == OP_INT:
+            values[i] = xs.dtype.type(operand)
+        else:
+            left, right = values[operand[0]], values[operand[1]]
+            if opcode == OP_DIV and not np.all(right):
+                raise ZeroDivisionError("integer division or modulo by zero")
+            values[i] = getattr(np, _UFUNCS[opcode])(left, right)
+            for j in set(operand):
+                if last[j] == i:
+                    del values[j]
+    return [np.broadcast_to(values[i], xs.shape) for i in outputs]
+
+
+# Number of X values evaluate_many() keeps in flight at once
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_UFUNCS = {
+    OP_ADD: "add",
+    OP_MUL: "multiply",
+    OP_SUB: "subtract",
+    OP_DIV: "floor_divide",
+}
+
+
+def _evaluate_chunk(code, xs):
+    # Leaves stay as the shared input chunk or as scalars. Operator results
+    # are written into an operand array this chunk already owns, so at most
+    # one temporary array is alive per stack slot.
+    stack = []
+    for opcode, operand in code:
+        if opcode == OP_X:
+            stack.append((xs, False))
+        elif opcode == OP_INT:
+            stack.append((xs.dtype.type(operand), False))
+        else:
+            right, right_owned = stack.pop()
+            left, left_owned = stack.pop()
+            if opcode == OP_DIV and not np.all(right):
+                raise ZeroDivisionError("integer division or modulo by zero")
+            if left_owned:
+                result = getattr(np, _UFUNCS[opcode])(left, right, out=left)
+            elif right_owned:
+                result = getattr(np, _UFUNCS[opcode])(left, right, out=right)
+            else:
+                result = getattr(np, _UFUNCS[opcode])(left, right)
+            stack.append((result, isinstance(result, np.ndarray)))
+    return stack.pop()[0]
+
+
+def _evaluate_many(code, xs, float64, chunk_size, out):
+    if np is None:
+        function = _generate_function(code)
+        convert = float if float64 else int
+        values = [function(convert(x)) for x in xs]
+        if out is None:
+            return values
+        out[:] = values
+        return out
+    dtype = np.float64 if float64 else np.int64
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    xs = np.asarray(xs)
+    if out is None:
+        out = np.empty(len(xs), dtype)
+    for start in range(0, len(xs), chunk_size):
+        chunk = xs[start : start + chunk_size].astype(dtype, copy=False)
+        out[start : start + chunk_size] = _evaluate_chunk(code, chunk)
+    return out
+
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+def _evaluate_checked_chunk(code, xs, invalid):
+    # _evaluate_chunk on int64, carrying a bound on each value's magnitude
+    # over the chunk. An operation whose bound fits runs unchecked; the rest
+    # set invalid at each X value where the result wrapped around, after
+    # which that value is meaningless. Zero divisors always set it.
+    largest = max(-int(xs.min()), int(xs.max())) if len(xs) else 0
+    stack = []
+    for opcode, operand in code:
+        if opcode == OP_X:
+            stack.append((xs, largest))
+        elif opcode == OP_INT:
+            stack.append((np.int64(operand), abs(operand)))
+        else:
+            right, right_bound = stack.pop()
+            left, left_bound = stack.pop()
+            if opcode == OP_ADD:
+                bound = left_bound + right_bound
+                result = left + right
+                if bound > _INT64_MAX:
+                    invalid |= ((left ^ result) & (right ^ result)) < 0
+            elif opcode == OP_SUB:
+                bound = left_bound + right_bound
+                result = left - right
+                if bound > _INT64_MAX:
+                    invalid |= ((left ^ right) & (left ^ result)) < 0
+            elif opcode == OP_MUL:
+                bound = left_bound * right_bound
+                result = left * right
+                if bound > _INT64_MAX:
+                    # Without overflow result // right gives left back; a
+                    # wrapped product is off by a multiple of 2**64 > |right|
+                    nonzero = right != 0
+                    check = np.floor_divide(result, np.where(nonzero, right, 1))
+                    invalid |= nonzero & (check != left)
+                    invalid |= (left == _INT64_MIN) & (right == -1)
+            else:
+                bound = left_bound
+                zero = right == 0
+                if np.any(zero):
+                    invalid |= zero
+                    right = np.where(zero, 1, right)
+                if bound > _INT64_MAX:
+                    invalid |= (left == _INT64_MIN) & (right == -1)
+                result = np.floor_divide(left, right)
+            # Every bound past int64 is as good as another, and capping it
+            # keeps the products of bounds small on deep trees
+            stack.append((result, min(bound, _INT64_MAX + 1)))
+    return np.broadcast_to(stack.pop()[0], xs.shape)
+
+
+def _unchecked_limit(code):
+    """Return the largest 2**k - 1 that |X| can reach before some value of
+    code could pass int64, or -1 when even X = 0 could."""
+
+    def fits(largest):
+        bounds = []
+        for opcode, operand in code:
+            if opcode == OP_X:
+                bounds.append(largest)
+            elif opcode == OP_INT:
+                bounds.append(abs(operand))
+            else:
+                right = bounds.pop()
+                if opcode == OP_MUL:
+                    bounds[-1] *= right
+                elif opcode != OP_DIV:
+                    bounds[-1] += right
+                if bounds[-1] > _INT64_MAX:
+                    return False
+        return True
+
+    if not fits(0):
+        return -1
+    low, high = 0, 63
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits((1 << middle) - 1):
+            low = middle
+        else:
+            high = middle - 1
+    return (1 << low) - 1
+
+
+def _exact_int(x):
+    # int(x), refusing the fractional values int() would truncate
+    value = int(x)
+    if value != x:
+        raise TypeError(f"X values must be integers, not {x!r}")
+    return value
+
+
+def _evaluate_exact(code, xs, chunk_size, function=None):
+    """Return the exact value at every x of xs as a list of ints.
+
+    Chunks run in int64. X values within _unchecked_limit() run without
+    overflow checks, the others with them, and only those whose evaluation
+    overflowed (or divided by zero), or that int64 cannot hold, are run
+    again with Python ints, through function or code compiled on first need.
+    Raises TypeError for X values that are not integers.
+    """
+    fits = all(
+        _INT64_MIN <= operand <= _INT64_MAX
+        for opcode, operand in code
+        if opcode == OP_INT
     )
+    if np is None or not fits:
+        function = function or _generate_function(code)
+        return [function(_exact_int(x)) for x in xs]
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    limit = _unchecked_limit(code)
+    values = []
+    with np.errstate(all="ignore"):
+        for start in range(0, len(xs), chunk_size):
+            chunk = xs[start : start + chunk_size]
+            source = np.asarray(chunk)
+            if source.dtype == np.int64:
+                array = source
+                invalid = np.zeros(len(array), dtype=bool)
+            elif source.dtype == object:  # Python ints beyond 64 bits
+                chunk = [_exact_int(x) for x in chunk]
+                invalid = np.array([not _INT64_MIN <= x <= _INT64_MAX for x in chunk])
+                array = np.array([0 if big else x for x, big in zip(chunk, invalid)])
+            else:
+                # uint64 beyond int64 wraps and floats truncate on the way
+                # in; whatever did not survive goes to Python ints instead
+                array = source.astype(np.int64)
+                invalid = array != source
+                array[invalid] = 0
+            small = (array >= -limit) & (array <= limit)
+            if small.all():
+                result = _evaluate_checked_chunk(code, array, invalid)
+            else:
+                result = np.empty(len(array), dtype=np.int64)
+                for part in (small, ~small):
+                    part_invalid = invalid[part]
+                    result[part] = _evaluate_checked_chunk(
+                        code, array[part], part_invalid
+                    )
+                    invalid[part] = part_invalid
+            result = result.tolist()
+            for i in np.flatnonzero(invalid).tolist():
+                function = function or _generate_function(code)
+                result[i] = function(_exact_int(chunk[i]))
+            values += result
+    return values
+
+
+# Per-process state of evaluate_parallel() workers, set by _start_worker
+_worker = {}
+
+
+def _attach(name, shape, dtype):
+    from multiprocessing import shared_memory
+
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype, buffer=memory.buf)
+
+
+def _start_worker(codes, xs_spec, out_spec):
+    _worker["codes"] = codes
+    _worker["xs_memory"], _worker["xs"] = _attach(*xs_spec)
+    _worker["out_memory"], _worker["out"] = _attach(*out_spec)
+
+
+def _evaluate_shard(first, last, start, stop):
+    codes, xs, out = _worker["codes"], _worker["xs"], _worker["out"]
+    chunk = xs[start:stop].astype(out.dtype, copy=False)
+    for i in range(first, last):
+        out[i, start:stop] = _evaluate_chunk(codes[i], chunk)
+
+
+def evaluate_parallel(
+    exprs, xs, float64=False, processes=None, chunk_size=None, out=None
+):
+    """Evaluate many expressions at the same X values on a process pool.
+
+    The work is cut into (group of expressions) x (chunk of xs) shards. xs
+    and the (len(exprs), len(xs)) result array live in shared memory, so
+    each worker receives the postfix code once and every shard is just four
+    indices. Values are int64 or float64 as in evaluate_many(). Without
+    numpy, or with processes=1, the shards are evaluated in this process.
+    """
+    codes = [to_postfix(expr) for expr in exprs]
+    processes = processes or os.cpu_count() or 1
+    if np is None:
+        return [_evaluate_many(code, xs, float64, None, None) for code in codes]
+    dtype = np.float64 if float64 else np.int64
+    xs = np.asarray(xs)
+    if out is None:
+        out = np.empty((len(codes), len(xs)), dtype)
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    chunks = range(0, len(xs), chunk_size)
+    # Aim for a few shards per process so that uneven shards balance out
+    groups = -(-4 * processes // max(len(chunks), 1))
+    group_size = max(1, -(-len(codes) // groups))
+    shards = [
+        (first, min(first + group_size, len(codes)), start, start + chunk_size)
+        for first in range(0, len(codes), group_size)
+        for start in chunks
+    ]
+    if processes == 1 or len(shards) <= 1:
+        for first, last, start, stop in shards:
+            chunk = xs[start:stop].astype(dtype, copy=False)
+            for i in range(first, last):
+                out[i, start:stop] = _evaluate_chunk(codes[i], chunk)
+        return out
+    # Imported on first use: the pool machinery would otherwise be a large
+    # share of the time to import this module, in every process
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    xs_memory = shared_memory.SharedMemory(create=True, size=max(xs.nbytes, 1))
+    out_memory = shared_memory.SharedMemory(create=True, size=max(out.nbytes, 1))
+    try:
+        np.ndarray(xs.shape, xs.dtype, buffer=xs_memory.buf)[:] = xs
+        results = np.ndarray(out.shape, dtype, buffer=out_memory.buf)
+        xs_spec = (xs_memory.name, xs.shape, xs.dtype)
+        out_spec = (out_memory.name, out.shape, dtype)
+        with ProcessPoolExecutor(
+            processes, initializer=_start_worker, initargs=(codes, xs_spec, out_spec)
+        ) as pool:
+            for _ in pool.map(_evaluate_shard, *zip(*shards)):
+                pass
+        out[:] = results
+        del results
+    finally:
+        xs_memory.close()
+        xs_memory.unlink()
+        out_memory.close()
+        out_memory.unlink()
+    return out
+
+
+def _postorder(expr, seen=None):
+    """Yield each distinct node of expr once, children before parents.
+
+    Passing the same seen set to several calls skips nodes already yielded.
+    """
+    if seen is None:
+        seen = set()
+    stack = [(expr, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node in seen:
+            continue
+        if expanded or isinstance(node, (X, Int)):
+            seen.add(node)
+            yield node
+        else:
+            stack.append((node, True))
+            stack.append((node.p2, False))
+            stack.append((node.p1, False))
+
+
+class NotPolynomialError(ValueError):
+    """Raised when an expression has no exact canonical polynomial form."""
+
+
+def _trim(coefficients):
+    while len(coefficients) > 1 and not coefficients[-1]:
+        coefficients.pop()
+    return coefficients
+
+
+def _add_lists(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    result = list(a)
+    for power, c in enumerate(b):
+        result[power] += c
+    return result
+
+
+def _add_coefficients(a, b):
+    return _trim(_add_lists(a, b))
+
+
+# Multiplication picks schoolbook below KARATSUBA_THRESHOLD coefficients in
+# the shorter operand, and the NTT from NTT_THRESHOLD coefficients per prime
+# the NTT needs for exact results. Both were tuned with
+# `python bench_polynomial.py multiply`.
+KARATSUBA_THRESHOLD = 32
+NTT_THRESHOLD = 96 if np is not None else 768
+
+
+def _multiply_coefficients(a, b):
+    shorter = min(len(a), len(b))
+    if shorter < KARATSUBA_THRESHOLD:
+        return _trim(_schoolbook(a, b))
+    primes = _ntt_primes_needed(a, b)
+    if primes and shorter >= NTT_THRESHOLD * len(primes):
+        return _trim(_ntt_multiply(a, b, primes))
+    return _trim(_karatsuba(a, b))
+
+
+def _schoolbook(a, b):
+    result = [0] * (len(a) + len(b) - 1)
+    for i, c in enumerate(a):
+        if c:
+            for j, d in enumerate(b):
+                result[i + j] += c * d
+    return result
+
+
+def _karatsuba(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    if len(b) < KARATSUBA_THRESHOLD:
+        return _schoolbook(a, b)
+    result = [0] * (len(a) + len(b) - 1)
+    if 2 * len(b) <= len(a):
+        # Unbalanced operands: multiply b by slices of a its own length
+        for start in range(0, len(a), len(b)):
+            for k, c in enumerate(_karatsuba(a[start : start + len(b)], b)):
+                result[start + k] += c
+        return result
+    half = len(a) // 2
+    low = _karatsuba(a[:half], b[:half])
+    high = _karatsuba(a[half:], b[half:])
+    middle = _karatsuba(_add_lists(a[:half], a[half:]), _add_lists(b[:half], b[half:]))
+    for k, c in enumerate(low):
+        result[k] += c
+        result[k + half] -= c
+    for k, c in enumerate(high):
+        result[k + 2 * half] += c
+        result[k + half] -= c
+    for k, c in enumerate(middle):
+        result[k + half] += c
+    return result
+
+
+# NTT primes p = c * 2**20 + 1 below 2**30: transforms of up to 2**20
+# points, with every butterfly product below 2**60 so it fits an int64.
+_NTT_ORDER = 20
+_ntt_primes = []
+
+
+def _is_prime(n):
+    # Deterministic Miller-Rabin for n < 3215031751
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for a in (2, 3, 5, 7):
+        if a % n == 0:
+            continue
+        y = pow(a, d, n)
+        if y in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            y = y * y % n
+            if y == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _get_ntt_primes():
+    """Return (prime, root) pairs, root being of order 2**_NTT_ORDER."""
+    if not _ntt_primes:
+        for c in range((1 << (30 - _NTT_ORDER)) - 1, 0, -1):
+            prime = (c << _NTT_ORDER) + 1
+            if not _is_prime(prime):
+                continue
+            factors = {2} | {q for q in range(3, c + 1) if c % q == 0 and _is_prime(q)}
+            generator = 2
+            while any(pow(generator, (prime - 1) // q, prime) == 1 for q in factors):
+                generator += 1
+            _ntt_primes.append((prime, pow(generator, c, prime)))
+    return _ntt_primes
+
+
+def _transform(values, root, prime):
+    """Iterative radix-2 NTT of values, whose length is the order of root."""
+    n = len(values)
+    bits = n.bit_length() - 1
+    if np is not None:
+        indices = np.arange(n)
+        reversed_indices = np.zeros(n, dtype=np.int64)
+        for bit in range(bits):
+            reversed_indices |= ((indices >> bit) & 1) << (bits - 1 - bit)
+        values = np.array(values, dtype=np.int64)[reversed_indices]
+    else:
+        values = [
+            values[int(format(i, "0%db" % bits)[::-1] or "0", 2)] for i in range(n)
+        ]
+    length = 2
+    while length <= n:
+        half = length // 2
+        step = pow(root, n // length, prime)
+        twiddles = [1] * half
+        for k in range(1, half):
+            twiddles[k] = twiddles[k - 1] * step % prime
+        if np is not None:
+            blocks = values.reshape(-1, length)
+            u = blocks[:, :half]
+            v = blocks[:, half:] * np.array(twiddles, dtype=np.int64) % prime
+            values = np.concatenate(((u + v) % prime, (u - v) % prime), axis=1)
+            values = values.ravel()
+        else:
+            for start in range(0, n, length):
+                for k in range(half):
+                    u = values[start + k]
+                    v = values[start + k + half] * twiddles[k] % prime
+                    values[start + k] = (u + v) % prime
+                    values[start + k + half] = (u - v) % prime
+        length <<= 1
+    return values.tolist() if np is not None else values
+
+
+def _ntt_primes_needed(a, b):
+    """Return the NTT primes whose product exceeds twice every coefficient
+    of a * b, or None when the product is too long or too large."""
+    if len(a) + len(b) - 1 > 1 << _NTT_ORDER:
+        return None
+    bound = 2 * min(len(a), len(b)) * max(map(abs, a)) * max(map(abs, b))
+    chosen = []
+    modulus = 1
+    for prime, root in _get_ntt_primes():
+        if modulus > bound:
+            return chosen
+        chosen.append((prime, root))
+        modulus *= prime
+    return chosen if modulus > bound else None
+
+
+def _ntt_multiply(a, b, primes):
+    """Multiply exactly through NTTs modulo each prime, recombined by CRT."""
+    size = len(a) + len(b) - 1
+    n = 1 << (size - 1).bit_length()
+    modulus = 1
+    for prime, root in primes:
+        modulus *= prime
+    result = [0] * size
+    for prime, root in primes:
+        root = pow(root, (1 << _NTT_ORDER) // n, prime)
+        fa = _transform([c % prime for c in a] + [0] * (n - len(a)), root, prime)
+        fb = _transform([c % prime for c in b] + [0] * (n - len(b)), root, prime)
+        product = _transform(
+            [x * y % prime for x, y in zip(fa, fb)], pow(root, -1, prime), prime
+        )
+        scale = pow(n, -1, prime)
+        # basis is 1 modulo this prime and 0 modulo the others
+        basis = modulus // prime
+        basis *= pow(basis, -1, prime)
+        for k in range(size):
+            result[k] += product[k] * scale % prime * basis
+    half = modulus // 2
+    result = [c % modulus for c in result]
+    return [c - modulus if c > half else c for c in result]
+
+
+# From MULTIPOINT_THRESHOLD degree and points on, evaluate_points() modulo an
+# integer uses subproduct trees instead of Horner's rule at each point; the
+# trees stop at blocks of MULTIPOINT_BLOCK points. Both were tuned with
+# `python bench_polynomial.py multipoint`.
+MULTIPOINT_THRESHOLD = 1536
+MULTIPOINT_BLOCK = 128
+
+
+def _truncate(coefficients, n):
+    """Return coefficients mod X**n as a list of exactly n entries."""
+    return (list(coefficients) + [0] * n)[:n]
+
+
+def _multiply_mod(a, b, modulus):
+    product = _multiply_coefficients(a, b)
+    return product if modulus is None else [c % modulus for c in product]
+
+
+def _series_inverse(h, n, modulus=None):
+    """Return g with h * g = 1 mod X**n, for h[0] == 1, by Newton iteration."""
+    g = [1]
+    size = 1
+    while size < n:
+        size = min(2 * size, n)
+        # g <- g * (2 - h * g) mod X**size doubles the correct terms
+        error = _truncate(_multiply_mod(h[:size], g, modulus), size)
+        error = [-c for c in error]
+        error[0] += 2
+        g = _truncate(_multiply_mod(g, error, modulus), size)
+    return g
+
+
+def _remainder_monic(f, m, inverse=None, modulus=None):
+    """Return f mod m for monic m, as exactly len(m) - 1 coefficients.
+
+    inverse, the series inverse of m reversed, switches on Newton division:
+    the quotient is then two multiplications instead of a quadratic loop.
+    """
+    degree = len(m) - 1
+    if len(f) <= degree:
+        return _truncate(f, degree)
+    if inverse is None:
+        remainder = list(f)
+        for i in range(len(f) - 1, degree - 1, -1):
+            c = remainder[i]
+            if modulus is not None:
+                c %= modulus
+            if c:
+                for j in range(degree):
+                    remainder[i - degree + j] -= c * m[j]
+        remainder = remainder[:degree]
+    else:
+        k = len(f) - degree
+        quotient = _multiply_mod(f[::-1][:k], inverse[:k], modulus)
+        quotient = _truncate(quotient, k)[::-1]
+        product = _truncate(_multiply_mod(quotient, m, modulus), degree)
+        remainder = [c - d for c, d in zip(f[:degree], product)]
+    if modulus is not None:
+        remainder = [c % modulus for c in remainder]
+    return remainder
+
+
+def _horner(coefficients, x_value, modulus=None):
+    value = 0
+    if modulus is None:
+        for c in reversed(coefficients):
+            value = value * x_value + c
+        return value
+    for c in reversed(coefficients):
+        value = (value * x_value + c) % modulus
+    return value
+
+
+def _multipoint(coefficients, xs, modulus=None):
+    """Evaluate coefficients at every x of xs with subproduct trees.
+
+    Points go in batches of len(coefficients), each with its own tree of
+    the products of (X - x), whose leaves are blocks of MULTIPOINT_BLOCK
+    points. Remainders are taken down the tree, by Newton division above the
+    leaves, and Horner's rule finishes each block. With a modulus every
+    coefficient is reduced, so each step costs O(1) word operations.
+    """
+    if modulus is not None:
+        coefficients = [c % modulus for c in coefficients]
+        xs = [x % modulus for x in xs]
+    n = max(len(coefficients), MULTIPOINT_BLOCK)
+    values = []
+    for start in range(0, len(xs), n):
+        batch = xs[start : start + n]
+        blocks = [
+            batch[i : i + MULTIPOINT_BLOCK]
+            for i in range(0, len(batch), MULTIPOINT_BLOCK)
+        ]
+        level = []
+        for block in blocks:
+            product = [1]
+            for x in block:
+                product = _add_lists([0] + product, [-x * c for c in product])
+                if modulus is not None:
+                    product = [c % modulus for c in product]
+            level.append(product)
+        tree = [level]
+        while len(level) > 1:
+            paired = [
+                _multiply_mod(a, b, modulus) for a, b in zip(level[::2], level[1::2])
+            ]
+            if len(level) % 2:
+                paired.append(level[-1])
+            level = paired
+            tree.append(level)
+        remainders = [list(coefficients)]
+        for level in reversed(tree):
+            divided = []
+            for i, m in enumerate(level):
+                f = remainders[i // 2]
+                inverse = None
+                if len(m) > MULTIPOINT_BLOCK + 1 and len(f) >= len(m):
+                    inverse = _series_inverse(m[::-1], len(f) - len(m) + 1, modulus)
+                divided.append(_remainder_monic(f, m, inverse, modulus))
+            remainders = divided
+        for block, remainder in zip(blocks, remainders):
+            values += [_horner(remainder, x, modulus) for x in block]
+    return values
+
+
+# divmod() of coefficient vectors uses Newton division, with the divisor's
+# reversed series inverse, once both the divisor's degree and the quotient's
+# length reach DIVISION_THRESHOLD, and classical long division below. Tuned
+# with `python bench_polynomial.py divide`.
+DIVISION_THRESHOLD = 1024
+
+
+def _divmod_coefficients(a, b):
+    """Return (q, r) with a = q * b + r and r of lower degree than b.
+
+    Both have integer coefficients, so the quotient must too: a step whose
+    leading coefficient b[-1] does not divide raises NotPolynomialError.
+    Newton division needs b[-1] to be 1 or -1, for b reversed to have a
+    series inverse; other divisors always use long division.
+    """
+    a, b = _trim(list(a)), _trim(list(b))
+    if not any(b):
+        raise ZeroDivisionError("polynomial division by zero")
+    degree = len(b) - 1
+    k = len(a) - degree
+    if k <= 0:
+        return [0], a
+    lead = b[-1]
+    if abs(lead) == 1 and min(degree, k) >= DIVISION_THRESHOLD:
+        # rev(q) = rev(a) / rev(b) mod X**k, from the inverse of lead * rev(b).
+        # Over the integers that inverse's coefficients grow exponentially, so
+        # q is found modulo 2**bits, in the symmetric range, and checked: a
+        # remainder of degree below b's is unique, so it is right once the
+        # remainder fits. Otherwise bits doubles and it tries again.
+        reversed_b = [lead * c for c in reversed(b)]
+        bits = max(abs(c) for c in a).bit_length() + 32
+        while True:
+            modulus = 1 << bits
+            inverse = _series_inverse(reversed_b, k, modulus)
+            quotient = _multiply_mod(a[::-1][:k], [lead * c for c in inverse], modulus)
+            half = modulus >> 1
+            quotient = [(c + half) % modulus - half for c in _truncate(quotient, k)]
+            quotient.reverse()
+            product = _multiply_coefficients(quotient, b)
+            remainder = [c - d for c, d in zip(a, product)]
+            if not any(remainder[degree:]):
+                remainder = remainder[:degree]
+                break
+            bits *= 2
+    else:
+        remainder = list(a)
+        quotient = [0] * k
+        for i in range(k - 1, -1, -1):
+            c, rest = divmod(remainder[i + degree], lead)
+            if rest:
+                raise NotPolynomialError(
+                    "quotient by " + repr(b) + " has fractional coefficients"
+                )
+            quotient[i] = c
+            if c:
+                for j in range(degree):
+                    remainder[i + j] -= c * b[j]
+        remainder = remainder[:degree]
+    return _trim(quotient), _trim(remainder)
+
+
+def _divide_coefficients(a, b, polynomial=False):
+    # Division by a constant is exact for all X only when it divides every
+    # coefficient. With polynomial=True, division by a polynomial is exact
+    # when it leaves no remainder: the quotient then agrees with // wherever
+    # the divisor is nonzero, but not at its roots, where // raises, so only
+    # simplify() asks for it and evaluation keeps such a Div.
+    if len(b) == 1 and b[0] and all(c % b[0] == 0 for c in a):
+        return [c // b[0] for c in a]
+    if len(a) == 1 and len(b) == 1 and b[0]:
+        return [a[0] // b[0]]
+    if polynomial and len(b) > 1:
+        quotient, remainder = _divmod_coefficients(a, b)
+        if not any(remainder):
+            return quotient
+    raise NotPolynomialError("division by " + repr(b) + " is not exact")
+
+
+# Div.simplify() replaces p1 / p2 by their exact quotient when both are
+# polynomials of at most EXACT_DIVISION_NODES nodes (counting a shared
+# subtree at each use) whose degrees, bounded from the tree, stay within
+# EXACT_DIVISION_DEGREE, so that the canonical forms it needs are cheap.
+EXACT_DIVISION_NODES = 4096
+EXACT_DIVISION_DEGREE = 4096
+
+
+def _division_size(expr, sizes):
+    """Return (nodes, degree bound, contains a Div) of expr, via sizes.
+
+    The counts are capped just past their limits. sizes maps nodes to these
+    triples and lives for one simplify call, which reaches every node's
+    operands before the node, so each lookup extends it by O(1) nodes.
+    """
+    size = sizes.get(expr)
+    if size is not None:
+        return size
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        cls = type(node)
+        if cls is X:
+            sizes[node] = (1, 1, False)
+        elif cls is Int:
+            sizes[node] = (1, 0, False)
+        else:
+            left = sizes.get(node.p1)
+            right = sizes.get(node.p2)
+            if left is None or right is None:
+                if left is None:
+                    stack.append(node.p1)
+                if right is None:
+                    stack.append(node.p2)
+                continue
+            degree = left[1] + right[1] if cls is Mul else max(left[1], right[1])
+            sizes[node] = (
+                min(left[0] + right[0] + 1, EXACT_DIVISION_NODES + 1),
+                min(degree, EXACT_DIVISION_DEGREE + 1),
+                left[2] or right[2] or cls is Div,
+            )
+        stack.pop()
+    return sizes[expr]
+
+
+def _exact_quotient(p1, p2, sizes=None):
+    """Return p1 / p2 as a simplified Horner form, or None if not exact.
+
+    p1 and p2 are simplified, so a Div left inside either did not divide
+    exactly (or was too large to try), and the quotient is not attempted.
+    """
+    sizes = {} if sizes is None else sizes
+    for operand in (p1, p2):
+        nodes, degree, divides = _division_size(operand, sizes)
+        if divides or nodes > EXACT_DIVISION_NODES or degree > EXACT_DIVISION_DEGREE:
+            return None
+    try:
+        quotient = _divide_coefficients(
+            _coefficients(p1), _coefficients(p2), polynomial=True
+        )
+    except NotPolynomialError:
+        return None
+    return _simplify(DensePolynomial(quotient).to_expression())
+
+
+def _coefficients(expr):
+    # One pass over the distinct nodes, combining the children's vectors
+    values = {}
+    for node in _postorder(expr):
+        if isinstance(node, X):
+            values[node] = [0, 1]
+        elif isinstance(node, Int):
+            values[node] = [node.i]
+        elif isinstance(node, Add):
+            values[node] = _add_coefficients(values[node.p1], values[node.p2])
+        elif isinstance(node, Sub):
+            negated = [-c for c in values[node.p2]]
+            values[node] = _add_coefficients(values[node.p1], negated)
+        elif isinstance(node, Mul):
+            values[node] = _multiply_coefficients(values[node.p1], values[node.p2])
+        else:
+            values[node] = _divide_coefficients(values[node.p1], values[node.p2])
+    return list(values[expr])
+
+
+class DensePolynomial:
+    """A polynomial in X as a coefficient vector, evaluated by Horner's rule."""
+
+    def __init__(self, coefficients):
+        self.coefficients = tuple(_trim(list(coefficients) or [0]))
+        # Horner form as postfix code: ((c_n * X + c_n-1) * X + ...) + c_0
+        self.code = [(OP_INT, self.coefficients[-1])]
+        for c in reversed(self.coefficients[:-1]):
+            self.code += [(OP_X, None), (OP_MUL, None)]
+            if c:
+                self.code += [(OP_INT, c), (OP_ADD, None)]
+        self.function = _generate_function(self.code)
+        self._dual = None
+
+    @classmethod
+    def from_expression(cls, expr):
+        return cls(expr.to_coefficients())
+
+    @property
+    def degree(self):
+        return len(self.coefficients) - 1
+
+    def __repr__(self):
+        return "DensePolynomial(" + repr(list(self.coefficients)) + ")"
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, DensePolynomial)
+            and self.coefficients == other.coefficients
+        )
+
+    def __hash__(self):
+        return hash(self.coefficients)
+
+    def __call__(self, x_value):
+        return self.function(x_value)
+
+    def __add__(self, other):
+        return DensePolynomial(_add_lists(self.coefficients, other.coefficients))
+
+    def __sub__(self, other):
+        negated = [-c for c in other.coefficients]
+        return DensePolynomial(_add_lists(self.coefficients, negated))
+
+    def __mul__(self, other):
+        product = _multiply_coefficients(self.coefficients, other.coefficients)
+        return DensePolynomial(product)
+
+    def __divmod__(self, other):
+        """Return (quotient, remainder) with self = quotient * other + remainder.
+
+        Raises NotPolynomialError when the quotient has fractional
+        coefficients, and ZeroDivisionError when other is zero.
+        """
+        quotient, remainder = _divmod_coefficients(
+            self.coefficients, other.coefficients
+        )
+        return DensePolynomial(quotient), DensePolynomial(remainder)
+
+    def __floordiv__(self, other):
+        return divmod(self, other)[0]
+
+    def __mod__(self, other):
+        return divmod(self, other)[1]
+
+    def evaluate(self, x_value):
+        return Int(self.function(x_value))
+
+    def value_and_derivative(self, x_value):
+        """Return the value and derivative at x_value by Horner's rule with
+        derivative, as ints."""
+        if self._dual is None:
+            self._dual = _generate_dual_function(self.code)
+        return self._dual(x_value)
+
+    def evaluate_many(self, xs, float64=False, chunk_size=None, out=None):
+        return _evaluate_many(self.code, xs, float64, chunk_size, out)
+
+    def evaluate_exact(self, xs, chunk_size=None):
+        return _evaluate_exact(self.code, xs, chunk_size, self.function)
+
+    def evaluate_points(self, xs, modulus=None):
+        """Return the values at every x of xs as a list of ints.
+
+        Modulo an integer, at degree and point count from MULTIPOINT_THRESHOLD
+        up, this uses subproduct trees: O(n log^2 n) operations rather than
+        Horner's O(n^2). Exact values use Horner's rule through
+        evaluate_exact(), since the tree's integer coefficients grow faster
+        than it saves work.
+        """
+        if modulus is None:
+            return self.evaluate_exact(xs)
+        xs = [int(x) for x in xs]
+        if min(self.degree, len(xs)) < MULTIPOINT_THRESHOLD:
+            return [_horner(self.coefficients, x, modulus) for x in xs]
+        return _multipoint(self.coefficients, xs, modulus)
+
+    def to_expression(self):
+        """Rebuild the Horner form as an expression tree."""
+        expr = Int(self.coefficients[-1])
+        for c in reversed(self.coefficients[:-1]):
+            expr = Mul(expr, X())
+            if c > 0:
+                expr = Add(expr, Int(c))
+            elif c < 0:
+                expr = Sub(expr, Int(-c))
+        return expr
+
+
+class ParseError(ValueError):
+    """Raised when text is not a well-formed expression."""
+
+
+_TOKEN = re.compile(r"[0-9]+|[-+*/()X]|\S")
+_PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2}
+
+
+def _reduce(operands, symbol):
+    right, _ = operands.pop()
+    left, chained = operands.pop()
+    if symbol == "+":
+        operands.append((Add(left, right), True))
+    elif symbol == "-":
+        # repr prints Add(a, Sub(b, c)) as "a + b - c", so an unparenthesized
+        # sum followed by "- c" takes the subtraction into its last term.
+        if chained and isinstance(left, Add):
+            operands.append((Add(left.p1, Sub(left.p2, right)), True))
+        else:
+            operands.append((Sub(left, right), True))
+    elif symbol == "*":
+        operands.append((Mul(left, right), False))
+    else:
+        operands.append((Div(left, right), False))
+
+
+def parse(text):
+    """Parse text in the format repr produces, such as "( 2 + 3 ) * X".
+
+    Multiplication and division bind tighter than addition and subtraction,
+    and operators of equal precedence group to the left. Parsing the repr of
+    any tree gives a tree with the same repr and the same values. Explicit
+    stacks keep deeply nested input from hitting the recursion limit.
+    """
+    tokens = _TOKEN.findall(text)
+    # Operands are (node, chained) pairs, chained meaning an unparenthesized
+    # Add or Sub built from the surrounding text.
+    operands = []
+    operators = []
+    expect_operand = True
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if expect_operand:
+            if token == "(":
+                operators.append(token)
+                continue
+            sign = 1
+            if token == "-" and i < len(tokens) and tokens[i].isdigit():
+                sign = -1
+                token = tokens[i]
+                i += 1
+            if token.isdigit():
+                operands.append((Int(sign * int(token)), False))
+            elif token == "X":
+                operands.append((X(), False))
+            else:
+                raise ParseError("expected an operand, got " + repr(token))
+            expect_operand = False
+        elif token == ")":
+            while operators and operators[-1] != "(":
+                _reduce(operands, operators.pop())
+            if not operators:
+                raise ParseError("unbalanced ')'")
+            operators.pop()
+            operands[-1] = (operands[-1][0], False)
+        elif token in _PRECEDENCE:
+            while (
+                operators
+                and operators[-1] != "("
+                and _PRECEDENCE[operators[-1]] >= _PRECEDENCE[token]
+            ):
+                _reduce(operands, operators.pop())
+            operators.append(token)
+            expect_operand = True
+        else:
+            raise ParseError("expected an operator, got " + repr(token))
+    if expect_operand:
+        raise ParseError("unexpected end of expression")
+    while operators:
+        symbol = operators.pop()
+        if symbol == "(":
+            raise ParseError("unbalanced '('")
+        _reduce(operands, symbol)
+    return operands[0][0]
+
+
+def parse_lines(lines):
+    """Lazily parse one expression per non-blank line of a file or iterable."""
+    for line in lines:
+        if line.strip():
+            yield parse(line)
+
+
+class Position:
+    """One place in an EditableExpression's tree, with its cached values."""
+
+    __slots__ = ("cls", "leaf", "parent", "left", "right", "values")
+
+    def __init__(self, cls, leaf, parent):
+        self.cls = cls
+        self.leaf = leaf
+        self.parent = parent
+        self.left = self.right = None
+        self.values = None
+
+
+class EditableExpression:
+    """An expression tracked at fixed X values whose subtrees can be replaced.
+
+    Every position caches its values at xs. replace() marks only the path
+    from the replaced position to the root dirty, so the next values() call
+    recomputes the new subtree and that path and nothing else.
+    """
+
+    def __init__(self, expr, xs):
+        self.xs = list(xs)
+        self.recomputed = 0
+        self.root = self._build(expr, None)
+
+    def _build(self, expr, parent):
+        top = Position(type(expr), None, parent)
+        stack = [(expr, top)]
+        while stack:
+            node, position = stack.pop()
+            if isinstance(node, X):
+                position.leaf = node
+                position.values = self.xs
+            elif isinstance(node, Int):
+                position.leaf = node
+                position.values = [node.i] * len(self.xs)
+            else:
+                position.left = Position(type(node.p1), None, position)
+                position.right = Position(type(node.p2), None, position)
+                stack.append((node.p2, position.right))
+                stack.append((node.p1, position.left))
+        return top
+
+    def at(self, *path):
+        """Return the position reached from the root by 1 (p1) and 2 (p2) steps."""
+        position = self.root
+        for step in path:
+            position = position.left if step == 1 else position.right
+        return position
+
+    def replace(self, position, expr):
+        """Put expr at position, which becomes invalid; return its replacement."""
+        parent = position.parent
+        new = self._build(expr, parent)
+        if parent is None:
+            self.root = new
+        elif parent.left is position:
+            parent.left = new
+        else:
+            parent.right = new
+        while parent is not None and parent.values is not None:
+            parent.values = None
+            parent = parent.parent
+        return new
+
+    def values(self):
+        """Return the expression's values at xs, recomputing dirty positions."""
+        stack = [self.root]
+        while stack:
+            position = stack[-1]
+            if position.values is not None:
+                stack.pop()
+            elif position.left.values is None:
+                stack.append(position.left)
+            elif position.right.values is None:
+                stack.append(position.right)
+            else:
+                apply = _APPLY[position.cls]
+                position.values = list(
+                    map(apply, position.left.values, position.right.values)
+                )
+                self.recomputed += 1
+                stack.pop()
+        return self.root.values
+
+    def expression(self, position=None):
+        """Rebuild the current expression, or the subtree at position."""
+        results = []
+        stack = [position or self.root]
+        while stack:
+            item = stack.pop()
+            if item is _COMBINE:
+                cls = stack.pop()
+                right = results.pop()
+                results[-1] = cls(results[-1], right)
+            elif item.leaf is not None:
+                results.append(item.leaf)
+            else:
+                stack += (item.cls, _COMBINE, item.right, item.left)
+        return results[0]
+
+
+# Primes for evaluate_multimod() lie below 2**MODULAR_PRIME_BITS, so that a
+# product of two residues fits an int64.
+MODULAR_PRIME_BITS = 31
+_modular_primes_found = []
+
+
+def _modular_primes(count):
+    """Return the count largest primes below 2**MODULAR_PRIME_BITS."""
+    candidate = _modular_primes_found[-1] if _modular_primes_found else None
+    if candidate is None:
+        candidate = (1 << MODULAR_PRIME_BITS) + 1
+    while len(_modular_primes_found) < count:
+        candidate -= 2
+        if _is_prime(candidate):
+            _modular_primes_found.append(candidate)
+    return _modular_primes_found[:count]
+
+
+def _bit_bound(code, x_value):
+    # Bits of a bound on |value| of each instruction; a quotient is no
+    # larger than its dividend.
+    bits = []
+    for opcode, operand in code:
+        if opcode == OP_X:
+            bits.append(abs(x_value).bit_length())
+        elif opcode == OP_INT:
+            bits.append(abs(operand).bit_length())
+        elif opcode == OP_MUL:
+            bits.append(bits[operand[0]] + bits[operand[1]])
+        elif opcode == OP_DIV:
+            bits.append(bits[operand[0]])
+        else:
+            bits.append(max(bits[operand[0]], bits[operand[1]]) + 1)
+    return bits
+
+
+def _evaluate_residue(code, x_value, modulus):
+    values = []
+    for opcode, operand in code:
+        if opcode == OP_X:
+            values.append(x_value % modulus)
+        elif opcode == OP_INT:
+            values.append(operand % modulus)
+        else:
+            a, b = values[operand[0]], values[operand[1]]
+            if opcode == OP_ADD:
+                values.append((a + b) % modulus)
+            elif opcode == OP_MUL:
+                values.append(a * b % modulus)
+            elif opcode == OP_SUB:
+                values.append((a - b) % modulus)
+            else:
+                try:
+                    values.append(a * pow(b, -1, modulus) % modulus)
+                except ValueError:
+                    raise ZeroDivisionError(
+                        "divisor has no inverse modulo %d" % modulus
+                    )
+    return values
+
+
+def _residues_of(n, primes):
+    """Return n modulo each prime of the int64 array primes."""
+    if abs(n) < 2**62:
+        return np.int64(n) % primes
+    # Horner's rule over the 16-bit digits of |n|
+    digits = np.frombuffer(abs(n).to_bytes(-(-n.bit_length() // 16) * 2, "big"), ">u2")
+    residues = np.zeros_like(primes)
+    for digit in digits.tolist():
+        residues = ((residues << 16) + digit) % primes
+    return -residues % primes if n < 0 else residues
+
+
+def _evaluate_residues(code, x_value, primes):
+    # One pass over the code with a vector of residues, one per prime;
+    # returns the residues of every instruction
+    if np is None:
+        columns = [_evaluate_residue(code, x_value, p) for p in primes]
+        return list(zip(*columns))
+    primes = np.array(primes, dtype=np.int64)
+    values = []
+    for opcode, operand in code:
+        if opcode == OP_X:
+            values.append(_residues_of(x_value, primes))
+        elif opcode == OP_INT:
+            values.append(_residues_of(operand, primes))
+        else:
+            a, b = values[operand[0]], values[operand[1]]
+            if opcode == OP_ADD:
+                values.append((a + b) % primes)
+            elif opcode == OP_MUL:
+                values.append(a * b % primes)
+            elif opcode == OP_SUB:
+                values.append((a - b) % primes)
+            elif not b.all():
+                raise ZeroDivisionError("divisor is a multiple of a modulus prime")
+            else:
+                # b**(p - 2) is the inverse of b modulo each prime p
+                inverse = np.ones_like(b)
+                exponent = primes - 2
+                while exponent.any():
+                    odd = (exponent & 1).astype(bool)
+                    inverse[odd] = inverse[odd] * b[odd] % primes[odd]
+                    b = b * b % primes
+                    exponent >>= 1
+                values.append(a * inverse % primes)
+    return values
+
+
+class ModularValue:
+    """An integer known by its residues modulo several distinct primes."""
+
+    __slots__ = ("primes", "residues")
+
+    def __init__(self, primes, residues):
+        self.primes = list(primes)
+        self.residues = list(residues)
+
+    def __repr__(self):
+        return "ModularValue(%d primes)" % len(self.primes)
+
+    @property
+    def modulus(self):
+        return _crt_basis(self.primes)[0]
+
+    def to_int(self):
+        """Rebuild the value by CRT, in the symmetric range around zero."""
+        modulus, inverses = _crt_basis(self.primes)
+        # value = sum of c * modulus / p, with c = residue / (modulus / p) mod
+        # p, summed up a product tree so that only the top is a big product
+        terms = [
+            (r * inverse % p, p)
+            for p, r, inverse in zip(self.primes, self.residues, inverses)
+        ]
+        while len(terms) > 1:
+            paired = [
+                (s1 * m2 + s2 * m1, m1 * m2)
+                for (s1, m1), (s2, m2) in zip(terms[::2], terms[1::2])
+            ]
+            if len(terms) % 2:
+                paired.append(terms[-1])
+            terms = paired
+        value = terms[0][0] % modulus if terms else 0
+        return value - modulus if value > modulus // 2 else value
+
+
+# CRT bases of recently used prime lists, which repeat from call to call
+_crt_bases = {}
+
+
+def _crt_basis(primes):
+    """Return the product of primes and 1 / (product / p) mod p for each p."""
+    key = tuple(primes)
+    if key not in _crt_bases:
+        if len(_crt_bases) >= 8:
+            _crt_bases.clear()
+        levels = [list(primes) or [1]]
+        while len(levels[-1]) > 1:
+            level = levels[-1]
+            paired = [a * b for a, b in zip(level[::2], level[1::2])]
+            if len(level) % 2:
+                paired.append(level[-1])
+            levels.append(paired)
+        # Going down the product tree, others[i] is the product of all the
+        # primes outside node i, reduced modulo the product of node i.
+        others = [1]
+        for level in reversed(levels[:-1]):
+            reduced = []
+            for i, q in enumerate(level):
+                other = others[i // 2] % q
+                if i ^ 1 < len(level):
+                    other = other * (level[i ^ 1] % q) % q
+                reduced.append(other)
+            others = reduced
+        inverses = [pow(other, -1, p) for other, p in zip(others, primes)]
+        _crt_bases[key] = levels[-1][0], inverses
+    return _crt_bases[key]
+
+
+# The Profile inside its with block, if any. Profiling swaps instrumented
+# traversals into the module globals the node methods call, so that the
+# normal paths carry no checks at all when it is off.
+_active_profile = None
+
+
+class Profile:
+    """Records what evaluate() and simplify() do inside a with block.
+
+    visits counts nodes visited per class, node_time the seconds spent
+    combining each class's operands, allocations the nodes newly created
+    per class (Int among them), max_depth the deepest node visited, and
+    cache_hits/cache_misses the simplify cache lookups. calls and
+    total_time are per operation, "evaluate" or "simplify".
+
+        with Profile() as profile:
+            expr.simplify().evaluate(3)
+        profile.to_json()
+    """
+
+    def __init__(self):
+        self.visits = Counter()
+        self.node_time = Counter()
+        self.allocations = Counter()
+        self.calls = Counter()
+        self.total_time = Counter()
+        self.max_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._saved = None
+
+    def __enter__(self):
+        global _active_profile, _evaluate, _simplify, _intern_pair
+        if _active_profile is not None:
+            raise RuntimeError("another Profile is already active")
+        _active_profile = self
+        self._saved = (_evaluate, _simplify, _intern_pair, X.__new__, Int.__new__)
+        _intern_pair = self._counting(_intern_pair)
+        _evaluate, _simplify = _profiled_evaluate, _profiled_simplify
+        X.__new__ = staticmethod(self._counting(X.__new__))
+        Int.__new__ = staticmethod(self._counting(Int.__new__))
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active_profile, _evaluate, _simplify, _intern_pair
+        _evaluate, _simplify, _intern_pair, x_new, int_new = self._saved
+        X.__new__ = staticmethod(x_new)
+        Int.__new__ = staticmethod(int_new)
+        _active_profile = None
+
+    def _counting(self, new):
+        allocations = self.allocations
+
+        def counted(*args):
+            before = len(_interned)
+            node = new(*args)
+            if len(_interned) > before:
+                allocations[type(node).__name__] += 1
+            return node
+
+        return counted
+
+    def to_dict(self):
+        return {
+            "calls": dict(self.calls),
+            "total_time": dict(self.total_time),
+            "visits": dict(self.visits),
+            "node_time": dict(self.node_time),
+            "allocations": dict(self.allocations),
+            "max_depth": self.max_depth,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+def _profiled_evaluate(expr, x_value):
+    # _evaluate with every stack entry carrying its depth
+    profile = _active_profile
+    visits, node_time = profile.visits, profile.node_time
+    clock = time.perf_counter
+    start = clock()
+    values = []
+    stack = [(expr, 1)]
+    while stack:
+        item, depth = stack.pop()
+        cls = type(item)
+        if cls in _APPLY:
+            visits[cls.__name__] += 1
+            stack += ((cls, depth), (item.p2, depth + 1), (item.p1, depth + 1))
+        elif cls is X or cls is Int:
+            visits[cls.__name__] += 1
+            values.append(x_value if cls is X else item.i)
+        else:
+            right = values.pop()
+            begin = clock()
+            values[-1] = _APPLY[item](values[-1], right)
+            node_time[item.__name__] += clock() - begin
+            continue
+        profile.max_depth = max(profile.max_depth, depth)
+    profile.calls["evaluate"] += 1
+    profile.total_time["evaluate"] += clock() - start
+    return values[0]
+
+
+def _profiled_simplify(expr, cache=None):
+    # _simplify with depths, timings and cache lookups recorded
+    profile = _active_profile
+    visits, node_time = profile.visits, profile.node_time
+    clock = time.perf_counter
+    start = clock()
+    cache = simplify_cache if cache is None else cache
+    sizes = {}
+    results = []
+    stack = [(expr, 1)]
+    while stack:
+        item, depth = stack.pop()
+        if item is _COMBINE:
+            node = stack.pop()[0]
+            p2 = results.pop()
+            begin = clock()
+            result = _simplify_node(node, results[-1], p2, sizes)
+            results[-1] = result
+            cache.put(node, result)
+            if result is not node and not isinstance(result, (X, Int)):
+                cache.put(result, result)
+            node_time[type(node).__name__] += clock() - begin
+            continue
+        visits[type(item).__name__] += 1
+        profile.max_depth = max(profile.max_depth, depth)
+        if isinstance(item, (X, Int)):
+            results.append(item)
+            continue
+        result = cache.get(item)
+        if result is None:
+            profile.cache_misses += 1
+            stack += (
+                (item, depth),
+                (_COMBINE, depth),
+                (item.p2, depth + 1),
+                (item.p1, depth + 1),
+            )
+        else:
+            profile.cache_hits += 1
+            results.append(result)
+    profile.calls["simplify"] += 1
+    profile.total_time["simplify"] += clock() - start
+    return results[0]
+
+
+def _fold(cls, p1, p2, sizes=None):
+    return _simplify_node(cls(p1, p2), p1, p2, sizes)
+
+
+def _derivative(expr):
+    """Differentiate expr with respect to X, once per distinct node.
+
+    Constant operands are folded as the derivative is built, so that
+    X * 3 gives 3 rather than 1 * 3 + X * 0.
+    """
+    derivatives = {}
+    sizes = {}
+    for node in _postorder(expr):
+        cls = type(node)
+        if cls is X:
+            derivatives[node] = Int(1)
+        elif cls is Int:
+            derivatives[node] = Int(0)
+        else:
+            p1, p2 = node.p1, node.p2
+            d1, d2 = derivatives[p1], derivatives[p2]
+            if cls is Add or cls is Sub:
+                derivatives[node] = _fold(cls, d1, d2)
+            elif cls is Mul:
+                derivatives[node] = _fold(Add, _fold(Mul, d1, p2), _fold(Mul, p1, d2))
+            else:
+                numerator = _fold(Sub, _fold(Mul, d1, p2), _fold(Mul, p1, d2))
+                derivatives[node] = _fold(Div, numerator, _fold(Mul, p2, p2), sizes)
+    return derivatives[expr]
+
+
+# Dual-number arithmetic on (value, derivative) pairs, with Div following
+# the quotient rule the way Div.derivative() does
+def _dual_add(a, b):
+    return a[0] + b[0], a[1] + b[1]
+
+
+def _dual_mul(a, b):
+    return a[0] * b[0], a[1] * b[0] + a[0] * b[1]
+
+
+def _dual_sub(a, b):
+    return a[0] - b[0], a[1] - b[1]
+
+
+def _dual_div(a, b):
+    return a[0] // b[0], (a[1] * b[0] - a[0] * b[1]) // (b[0] * b[0])
+
+
+_DUAL = {Add: _dual_add, Mul: _dual_mul, Sub: _dual_sub, Div: _dual_div}
+
+
+def _evaluate_dual(expr, x_value):
+    # _evaluate on dual numbers: X is (x, 1) and a constant is (c, 0)
+    values = []
+    stack = [expr]
+    while stack:
+        item = stack.pop()
+        cls = type(item)
+        if cls is X:
+            values.append((x_value, 1))
+        elif cls is Int:
+            values.append((item.i, 0))
+        elif cls in _DUAL:
+            stack += (_DUAL[cls], item.p2, item.p1)
+        else:
+            right = values.pop()
+            values[-1] = item(values[-1], right)
+    return values[0]
+
+
+def _generate_dual_function(code, real=False):
+    # _generate_function emitting a value and a derivative local per stack
+    # slot. Run on Horner code this is Horner's rule with derivative. With
+    # real=True constants are floats and Div is true division, so the
+    # function also runs on float64 arrays.
+    namespace = {}
+    lines = []
+    names = []
+    divide = "/" if real else "//"
+    for opcode, operand in code:
+        if opcode == OP_X:
+            names.append(("x", "1"))
+        elif opcode == OP_INT:
+            if real:
+                names.append(("(%r)" % float(operand), "0"))
+            elif type(operand) is int and abs(operand) < 2**63:
+                names.append(("(%d)" % operand, "0"))
+            else:
+                name = "k%d" % len(namespace)
+                namespace[name] = operand
+                names.append((name, "0"))
+        else:
+            right, right_d = names.pop()
+            left, left_d = names.pop()
+            value = "v%d" % len(names)
+            slope = "d%d" % len(names)
+            if opcode == OP_ADD or opcode == OP_SUB:
+                sign = _OPERATORS[opcode]
+                lines.append("    %s = %s %s %s" % (slope, left_d, sign, right_d))
+                lines.append("    %s = %s %s %s" % (value, left, sign, right))
+            elif opcode == OP_MUL:
+                lines.append(
+                    "    %s = %s * %s + %s * %s" % (slope, left_d, right, left, right_d)
+                )
+                lines.append("    %s = %s * %s" % (value, left, right))
+            else:
+                lines.append(
+                    "    %s = (%s * %s - %s * %s) %s (%s * %s)"
+                    % (slope, left_d, right, left, right_d, divide, right, right)
+                )
+                lines.append("    %s = %s %s %s" % (value, left, divide, right))
+            names.append((value, slope))
+    lines.append("    return %s, %s" % names.pop())
+    exec("def _dual(x):\n" + "\n".join(lines), namespace)
+    return namespace["_dual"]
+
+
+def newton(expr, x0s, iterations=50, tolerance=1e-12):
+    """Refine every starting point of x0s towards a root of expr.
+
+    Newton's method runs on all the points at once in float64, each step
+    one fused pass computing f and f' together. Div is true division here,
+    so this finds roots of the rational function expr denotes. A point
+    stops once its step is within tolerance (relative to the point, for
+    points beyond 1 in magnitude) or where f' vanishes. Returns the points
+    and whether each converged, as arrays, or lists without numpy.
+    """
+    if any(isinstance(node, Div) for node in _postorder(expr)):
+        code = to_postfix(expr)  # the canonical form would floor 7 / 2
+    else:
+        code = expr.evaluator().code
+    function = _generate_dual_function(code, real=True)
+    if np is None:
+        roots, converged = [float(x) for x in x0s], []
+        for i, x in enumerate(roots):
+            done = False
+            for _ in range(iterations):
+                try:
+                    value, slope = function(x)
+                    step = value / slope if value else 0.0
+                except ZeroDivisionError:
+                    break
+                x -= step
+                if abs(step) <= tolerance * max(1.0, abs(x)):
+                    done = True
+                    break
+            roots[i] = x
+            converged.append(done)
+        return roots, converged
+    roots = np.array(x0s, dtype=np.float64)
+    converged = np.zeros(len(roots), dtype=bool)
+    active = np.arange(len(roots))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(iterations):
+            if not len(active):
+                break
+            x = roots[active]
+            value, slope = function(x)
+            step = np.broadcast_to(np.where(value == 0, 0.0, value / slope), x.shape)
+            moving = np.isfinite(step)
+            x = np.where(moving, x - step, x)
+            roots[active] = x
+            done = moving & (np.abs(step) <= tolerance * np.maximum(1.0, np.abs(x)))
+            converged[active[done]] = True
+            active = active[moving & ~done]
+    return roots, converged
+
+
+class ExpressionArena:
+    """Expression nodes stored in parallel columns, addressed by integer handles.
+
+    Node h has opcodes[h], children left[h] and right[h] (handles below h)
+    and, for OP_INT, the value values[h]; integers beyond int64 are kept in
+    the big dict instead. That is 17 bytes per node instead of the several
+    hundred an interned object and its table entry take.
+
+        arena = ExpressionArena()
+        root = arena.add(arena.mul(arena.x(), arena.x()), arena.constant(1))
+        arena.evaluate(root, 3)  # 10
+    """
+
+    def __init__(self):
+        self.opcodes = array("B")
+        self.left = array("i")
+        self.right = array("i")
+        self.values = array("q")
+        self.big = {}
+        self._x = None
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    @property
+    def nbytes(self):
+        return sum(
+            len(column) * column.itemsize
+            for column in (self.opcodes, self.left, self.right, self.values)
+        )
+
+    @property
+    def bytes_per_node(self):
+        return self.nbytes / max(len(self), 1)
+
+    def columns(self):
+        """Return the columns as NumPy arrays sharing the arena's memory,
+        or as the arrays themselves without numpy."""
+        columns = {
+            "opcodes": self.opcodes,
+            "left": self.left,
+            "right": self.right,
+            "values": self.values,
+        }
+        if np is None:
+            return columns
+        return {
+            name: np.frombuffer(column, dtype=column.typecode)
+            for name, column in columns.items()
+        }
+
+    def _append(self, opcode, left, right, value):
+        handle = len(self.opcodes)
+        self.opcodes.append(opcode)
+        self.left.append(left)
+        self.right.append(right)
+        self.values.append(value)
+        return handle
+
+    def x(self):
+        if self._x is None:
+            self._x = self._append(OP_X, 0, 0, 0)
+        return self._x
+
+    def constant(self, value):
+        if _INT64_MIN <= value <= _INT64_MAX:
+            return self._append(OP_INT, 0, 0, value)
+        handle = self._append(OP_INT, 0, 0, 0)
+        self.big[handle] = value
+        return handle
+
+    def add(self, left, right):
+        return self._append(OP_ADD, left, right, 0)
+
+    def mul(self, left, right):
+        return self._append(OP_MUL, left, right, 0)
+
+    def sub(self, left, right):
+        return self._append(OP_SUB, left, right, 0)
+
+    def div(self, left, right):
+        return self._append(OP_DIV, left, right, 0)
+
+    def constant_value(self, handle):
+        return self.big.get(handle, self.values[handle])
+
+    def insert(self, expr):
+        """Copy expr into the arena, each distinct node once; return its handle."""
+        handles = {}
+        for node in _postorder(expr):
+            if isinstance(node, X):
+                handles[node] = self.x()
+            elif isinstance(node, Int):
+                handles[node] = self.constant(node.i)
+            else:
+                opcode = _OPCODES[type(node)]
+                handles[node] = self._append(
+                    opcode, handles[node.p1], handles[node.p2], 0
+                )
+        return handles[expr]
+
+    def expression(self, handle):
+        """Rebuild the node classes for handle."""
+        nodes = {}
+        for i in self._schedule(handle)[0]:
+            opcode = self.opcodes[i]
+            if opcode == OP_X:
+                nodes[i] = X()
+            elif opcode == OP_INT:
+                nodes[i] = Int(self.constant_value(i))
+            else:
+                left, right = nodes[self.left[i]], nodes[self.right[i]]
+                nodes[i] = _CLASSES[opcode](left, right)
+        return nodes[handle]
+
+    def _schedule(self, handle):
+        # The handles reachable from handle in increasing order, which puts
+        # children first, and how many parents read each. Only reachable
+        # handles are visited, so the cost follows the size of the expression
+        # rather than where handle sits in the arena.
+        opcodes, left, right = self.opcodes, self.left, self.right
+        reads = {handle: 0}
+        stack = [handle]
+        while stack:
+            i = stack.pop()
+            if opcodes[i] > OP_INT:
+                for child in (left[i], right[i]):
+                    if child in reads:
+                        reads[child] += 1
+                    else:
+                        reads[child] = 1
+                        stack.append(child)
+        return sorted(reads), reads
+
+    def evaluate(self, handle, x_value):
+        """Return the exact value of handle at x_value as an int.
+
+        Each value is dropped once its last parent has read it, so memory
+        follows the width of the expression rather than its size.
+        """
+        opcodes, left, right = self.opcodes, self.left, self.right
+        order, reads = self._schedule(handle)
+        reads[handle] += 1
+        values = {}
+        apply = _APPLY_OPCODE
+        for i in order:
+            opcode = opcodes[i]
+            if opcode == OP_X:
+                values[i] = x_value
+            elif opcode == OP_INT:
+                values[i] = self.constant_value(i)
+            else:
+                a = left[i]
+                b = right[i]
+                values[i] = apply[opcode](values[a], values[b])
+                reads[a] -= 1
+                if not reads[a]:
+                    del values[a]
+                reads[b] -= 1
+                if not reads[b]:
+                    del values[b]
+        return values[handle]
+
+    def evaluate_many(self, handle, xs, float64=False, chunk_size=None):
+        """Evaluate handle at every value of xs with one array operation per
+        reachable node, as evaluate_many() does for trees."""
+        code = []
+        index = {}
+        for i in self._schedule(handle)[0]:
+            index[i] = len(code)
+            opcode = self.opcodes[i]
+            if opcode == OP_X:
+                code.append((OP_X, None))
+            elif opcode == OP_INT:
+                code.append((OP_INT, self.constant_value(i)))
+            else:
+                code.append((opcode, (index[self.left[i]], index[self.right[i]])))
+        outputs = [index[handle]]
+        if np is None:
+            function = _generate_dag_function(code, outputs)
+            convert = float if float64 else int
+            return [function(convert(x))[0] for x in xs]
+        dtype = np.float64 if float64 else np.int64
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        xs = np.asarray(xs)
+        out = np.empty(len(xs), dtype)
+        for start in range(0, len(xs), chunk_size):
+            chunk = xs[start : start + chunk_size].astype(dtype, copy=False)
+            out[start : start + chunk_size] = _evaluate_dag_chunk(code, outputs, chunk)[
+                0
+            ]
+        return out
+
+    def simplify(self, handle):
+        """Apply simplify()'s local rules to handle and return the result.
+
+        Nodes that change are appended; unchanged ones keep their handles.
+        Exact polynomial division is left to the node classes.
+        """
+        opcodes, left, right = self.opcodes, self.left, self.right
+        order, reads = self._schedule(handle)
+        reads[handle] += 1
+        results = {}
+        for i in order:
+            if opcodes[i] <= OP_INT:
+                results[i] = i
+                continue
+            a, b = left[i], right[i]
+            results[i] = self._simplify_node(i, results[a], results[b])
+            for j in (a, b):
+                reads[j] -= 1
+                if not reads[j]:
+                    del results[j]
+        return results[handle]
+
+    def _simplify_node(self, i, a, b):
+        # _simplify_node on handles: a and b are the simplified operands
+        opcode = self.opcodes[i]
+        p1 = self.constant_value(a) if self.opcodes[a] == OP_INT else None
+        p2 = self.constant_value(b) if self.opcodes[b] == OP_INT else None
+        constant = p1 is not None and p2 is not None
+        if opcode == OP_ADD:
+            if constant:
+                return self.constant(p1 + p2)
+            if p1 == 0:
+                return b
+            if p2 == 0:
+                return a
+        elif opcode == OP_MUL:
+            if constant:
+                return self.constant(p1 * p2)
+            if p1 == 0 or p2 == 0:
+                return self.constant(0)
+            if p1 == 1:
+                return b
+            if p2 == 1:
+                return a
+        elif opcode == OP_SUB:
+            if constant:
+                return self.constant(p1 - p2)
+            if p2 == 0:
+                return a
+            if a == b:
+                return self.constant(0)
+        else:
+            if constant and p2:
+                return self.constant(p1 // p2)
+            if p2 == 1:
+                return a
+        if a == self.left[i] and b == self.right[i]:
+            return i
+        return self._append(opcode, a, b, 0)
+
+
+# Binary format: MAGIC, then one record per expression, each a varint byte
+# length followed by postfix opcodes. OP_INT is followed by a zigzag varint,
+# and OP_REF by the varint index of an earlier Add/Mul/Sub/Div node of the
+# same record (numbered in the order they were written), so shared subtrees
+# are stored once.
+MAGIC = b"PLY\x01"
+OP_REF = 6
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def dumps(expr):
+    """Encode one expression as a compact postfix byte string."""
+    out = bytearray()
+    written = {}
+    stack = [(expr, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, X):
+            out.append(OP_X)
+        elif isinstance(node, Int):
+            out.append(OP_INT)
+            _write_varint(out, 2 * node.i if node.i >= 0 else -2 * node.i - 1)
+        elif node in written:
+            out.append(OP_REF)
+            _write_varint(out, written[node])
+        elif expanded:
+            out.append(_OPCODES[type(node)])
+            written[node] = len(written)
+        else:
+            stack.append((node, True))
+            stack.append((node.p2, False))
+            stack.append((node.p1, False))
+    return bytes(out)
+
+
+def _decode(data, start, end, x_value=None):
+    # Run the postfix code in data[start:end], building nodes when x_value
+    # is None and computing plain ints otherwise.
+    stack = []
+    shared = []
+    pos = start
+    while pos < end:
+        opcode = data[pos]
+        pos += 1
+        if opcode == OP_X:
+            stack.append(X() if x_value is None else x_value)
+        elif opcode == OP_INT:
+            z, pos = _read_varint(data, pos)
+            value = z >> 1 if not z & 1 else -(z >> 1) - 1
+            stack.append(Int(value) if x_value is None else value)
+        elif opcode == OP_REF:
+            index, pos = _read_varint(data, pos)
+            stack.append(shared[index])
+        else:
+            right = stack.pop()
+            left = stack.pop()
+            if x_value is None:
+                value = _CLASSES[opcode](left, right)
+            else:
+                value = _APPLY_OPCODE[opcode](left, right)
+            stack.append(value)
+            shared.append(value)
+    if len(stack) != 1:
+        raise ValueError("malformed expression record")
+    return stack[0]
+
+
+def loads(data):
+    """Decode bytes produced by dumps() back into an expression."""
+    try:
+        return _decode(data, 0, len(data))
+    except IndexError:
+        raise ValueError("truncated expression record") from None
+
+
+def dump(exprs, file):
+    """Write expressions to a binary file object as length-prefixed records."""
+    file.write(MAGIC)
+    for expr in exprs:
+        body = dumps(expr)
+        header = bytearray()
+        _write_varint(header, len(body))
+        file.write(header)
+        file.write(body)
+
+
+class ExpressionFile:
+    """A memory-mapped file written by dump(), read without building nodes.
+
+    Records are located by one scan of their length prefixes; evaluate()
+    runs a record's postfix code straight from the mapped bytes, and
+    expression() builds the nodes only when they are asked for.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[: len(MAGIC)] != MAGIC:
+            self._data.close()
+            raise ValueError(path + " is not an expression file")
+        self._starts = []
+        self._ends = []
+        pos = len(MAGIC)
+        try:
+            while pos < len(self._data):
+                size, pos = _read_varint(self._data, pos)
+                self._starts.append(pos)
+                pos += size
+                self._ends.append(pos)
+        except IndexError:  # the file ends inside a length prefix
+            pos = None
+        if pos != len(self._data):
+            self._data.close()
+            raise ValueError(path + " ends with a truncated record")
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._data.close()
+
+    def expression(self, index):
+        return _decode(self._data, self._starts[index], self._ends[index])
+
+    def evaluate(self, index, x_value):
+        """Evaluate record index at x_value as a plain int."""
+        return _decode(self._data, self._starts[index], self._ends[index], x_value)
+
+    def evaluate_all(self, x_value):
+        data = self._data
+        return [
+            _decode(data, start, end, x_value)
+            for start, end in zip(self._starts, self._ends)
+        ]
+
+
+def load(file):
+    """Lazily decode every expression of a binary file object from dump()."""
+    data = file.read()
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError("not an expression file")
+    pos = len(MAGIC)
+    while pos < len(data):
+        try:
+            size, pos = _read_varint(data, pos)
+        except IndexError:
+            raise ValueError("truncated expression record") from None
+        if pos + size > len(data):
+            raise ValueError("truncated expression record")
+        yield loads(data[pos : pos + size])
+        pos += size
+
+
+def _demo():
+    """Print the original examples; run by `python polynomial.py`."""
+    # Original polynomial example
+    poly = Add(Add(Int(4), Int(3)), Add(X(), Mul(Int(1), Add(Mul(X(), X()), Int(1)))))
+    print("Original polynomial:", poly)
+
+    # Test new Sub and Div classes (will fail until implemented)
+    print("\n--- Testing Sub and Div classes ---")
+    try:
+        sub_poly = Sub(Int(10), Int(3))
+        print("Subtraction:", sub_poly)
+    except Exception as e:
+        print("❌ Subtraction test failed - Sub class not implemented yet")
+
+    try:
+        div_poly = Div(Int(15), Int(3))
+        print("Division:", div_poly)
+    except Exception as e:
+        print("❌ Division test failed - Div class not implemented yet")
+
+    # Test evaluation (will fail until implemented)
+    print("\n--- Testing evaluation ---")
+    try:
+        simple_poly = Add(Sub(Mul(Int(2), X()), Int(1)), Div(Int(6), Int(2)))
+        print("Test polynomial:", simple_poly)
+        result = simple_poly.evaluate(4)
+        print(f"Evaluation for X=4: {result}")
+    except Exception as e:
+        print("❌ Evaluation test failed - evaluate methods not implemented yet")
+
+    try:
+        original_result = poly.evaluate(2)
+        print(f"Original polynomial evaluation for X=2: {original_result}")
+    except Exception as e:
+        print(
+            "❌ Original polynomial evaluation failed - evaluate methods not implemented yet"
+        )
+
 
 # Option to run comprehensive tests
 if __name__ == "__main__":
     import sys
 
+    _demo()
     if len(sys.argv) > 1 and sys.argv[1] == "--test":
         print("\n" + "=" * 60)
         print("Running comprehensive test suite...")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Asyncio evaluation server for the polynomial expression system.
+
+Clients send one JSON object per line, {"expression": "X * X + 1", "xs": [1, 2]},
+and receive one per line, {"values": [2, 5]} or {"error": "..."}. Requests for
+the same expression that arrive within `window` seconds of each other are
+evaluated together, with compiled forms of hot expressions kept in an LRU cache.
+Run with `python polynomial_server.py [--port N | --unix PATH] [--window-ms MS]`.
+"""
+
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+
+from polynomial import parse
+
+
+class EvaluatorCache:
+    """A bounded LRU map from expression text to its evaluator."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._evaluators = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._evaluators)
+
+    def get(self, text):
+        """Return the evaluator of text, parsing and compiling it on a miss."""
+        evaluator = self._evaluators.get(text)
+        if evaluator is None:
+            self.misses += 1
+            evaluator = parse(text).evaluator()
+            self._evaluators[text] = evaluator
+            while len(self._evaluators) > self.maxsize:
+                self._evaluators.popitem(last=False)
+        else:
+            self.hits += 1
+            self._evaluators.move_to_end(text)
+        return evaluator
+
+
+class _Batch:
+    """The requests waiting on one expression, and their X value count."""
+
+    __slots__ = ("requests", "points")
+
+    def __init__(self):
+        self.requests = []
+        self.points = 0
+
+
+class EvaluationServer:
+    """Evaluates expressions for clients, coalescing concurrent requests.
+
+    The first request for an expression opens a batch that closes after
+    window seconds, or as soon as it holds max_batch X values; all of its
+    requests are then answered from one pass of the compiled evaluator.
+    If that pass fails, each request is evaluated on its own, so that only
+    the requests at fault receive the error.
+    """
+
+    def __init__(self, window=0.002, max_batch=4096, cache_size=1024):
+        self.window = window
+        self.max_batch = max_batch
+        self.cache = EvaluatorCache(cache_size)
+        self.requests = 0
+        self.batches = 0
+        self._pending = {}
+        self._handlers = set()
+
+    async def evaluate(self, text, xs):
+        """Return the exact values of the expression text at xs."""
+        self.requests += 1
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(text)
+        if batch is None:
+            batch = self._pending[text] = _Batch()
+            if self.window > 0:
+                asyncio.get_running_loop().call_later(
+                    self.window, self._flush, text, batch
+                )
+        batch.requests.append((xs, future))
+        batch.points += len(xs)
+        if self.window <= 0 or batch.points >= self.max_batch:
+            self._flush(text, batch)
+        return await future
+
+    def _flush(self, text, batch):
+        if self._pending.get(text) is not batch:
+            return  # already flushed because it filled up
+        del self._pending[text]
+        self.batches += 1
+        # a waiter cancelled while the batch was open has no one to answer
+        requests = [(xs, future) for xs, future in batch.requests if not future.done()]
+        error = None
+        try:
+            evaluator = self.cache.get(text)
+            try:
+                values = evaluator.evaluate_exact([x for xs, _ in requests for x in xs])
+            except (ValueError, ArithmeticError):
+                values = None  # some request's X failed; find out whose
+            start = 0
+            for xs, future in requests:
+                if values is not None:
+                    future.set_result(values[start : start + len(xs)])
+                    start += len(xs)
+                    continue
+                try:
+                    future.set_result(evaluator.evaluate_exact(xs))
+                except (ValueError, ArithmeticError) as e:
+                    future.set_exception(e)
+        except Exception as e:
+            error = e
+        finally:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(error or RuntimeError("batch not evaluated"))
+
+    async def handle(self, reader, writer):
+        """Answer each request line of one connection in turn."""
+        self._handlers.add(asyncio.current_task())
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    xs = [int(x) for x in request["xs"]]
+                    response = {
+                        "values": await self.evaluate(request["expression"], xs)
+                    }
+                except (ValueError, ArithmeticError, KeyError, TypeError) as e:
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def wait_closed(self):
+        """Wait until every open connection has been closed by its client."""
+        await asyncio.gather(*self._handlers)
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """Start listening on a TCP port, or on a Unix socket at path."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "cached": len(self.cache),
+        }
+
+
+async def request(reader, writer, text, xs):
+    """Send one request over an open connection and return its values."""
+    writer.write(json.dumps({"expression": text, "xs": xs}).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    if "error" in response:
+        raise ValueError(response["error"])
+    return response["values"]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket")
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=4096)
+    args = parser.parse_args()
+    server = EvaluationServer(args.window_ms / 1000, args.max_batch)
+    listener = await server.start(args.host, args.port, args.unix)
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,7 +4,45 @@ Comprehensive test suite for polynomial expression system.
 Tests operator precedence, mathematical rules, and edge cases.
 """
 
-from polynomial import Add, Div, Int, Mul, Sub, X
+import asyncio
+import io
+import json
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+from math import comb
+
+import polynomial
+from polynomial import (
+    Add,
+    CompiledExpression,
+    DensePolynomial,
+    Div,
+    EditableExpression,
+    ExpressionArena,
+    ExpressionDAG,
+    ExpressionFile,
+    Int,
+    ModularValue,
+    Mul,
+    NotPolynomialError,
+    ParseError,
+    Profile,
+    Sub,
+    X,
+    dump,
+    dumps,
+    evaluate_parallel,
+    load,
+    loads,
+    newton,
+    parse,
+    parse_lines,
+    simplify_cache,
+)
 
 
 def test_basic_operations():
@@ -254,6 +292,1084 @@ def test_representation_accuracy():
     print(f"✓ Complex representation: {representation}")
 
 
+def test_compiled_evaluation():
+    """Test that compiled expressions agree with tree-walking evaluate"""
+    print("\n=== Testing Compiled Evaluation ===")
+
+    # Test: compiled 1 + 2 * 3 - 4 / 2 should equal 5
+    mixed = Sub(Add(Int(1), Mul(Int(2), Int(3))), Div(Int(4), Int(2)))
+    compiled = mixed.compile()
+    assert isinstance(compiled, CompiledExpression)
+    assert compiled(0) == 5, f"Compiled mixed test failed: {compiled(0)} != 5"
+    print(f"✓ compiled {mixed} = {compiled(0)}")
+
+    # Test: compiled (X + 2) * (X - 1) + (X * 3) agrees with evaluate
+    nested = Add(Mul(Add(X(), Int(2)), Sub(X(), Int(1))), Mul(X(), Int(3)))
+    compiled = nested.compile()
+    for x_value in [-7, -1, 0, 1, 3, 10**30]:
+        expected = nested.evaluate(x_value)
+        result = compiled.evaluate(x_value)
+        assert result.i == expected.i, f"Compiled X={x_value}: {result} != {expected}"
+    print(f"✓ compiled {nested} matches evaluate")
+
+    # Test: floor division and huge constants keep Python int semantics
+    floor_div = Div(Sub(X(), Int(10**40)), Int(-3))
+    compiled = floor_div.compile()
+    result = compiled(7)
+    expected = floor_div.evaluate(7)
+    assert (
+        result == expected.i
+    ), f"Compiled floor division failed: {result} != {expected}"
+    print(f"✓ compiled floor division (X=7) = {result}")
+
+    # Test: a lone leaf compiles too
+    assert X().compile()(9) == 9, "Compiled X failed"
+    assert Int(4).compile()(9) == 4, "Compiled Int failed"
+    print("✓ compiled leaves X and Int")
+
+
+def test_batch_evaluation():
+    """Test that evaluate_many matches evaluate at every X value"""
+    print("\n=== Testing Batch Evaluation ===")
+
+    # Test: 2 * X + 3 - X / 2 over negative and positive X, in small chunks
+    mixed = Sub(Add(Mul(Int(2), X()), Int(3)), Div(X(), Int(2)))
+    xs = list(range(-20, 21))
+    result = list(mixed.evaluate_many(xs, chunk_size=7))
+    expected = [mixed.evaluate(x).i for x in xs]
+    assert result == expected, f"Batch evaluation failed: {result} != {expected}"
+    print(f"✓ {mixed} over X=-20..20 matches evaluate (floor division)")
+
+    # Test: compiled expressions share the batch path
+    compiled = mixed.compile()
+    result = list(compiled.evaluate_many(xs))
+    assert result == expected, f"Compiled batch failed: {result} != {expected}"
+    print("✓ compiled evaluate_many matches evaluate")
+
+    # Test: float64 mode
+    quadratic = Add(Add(Mul(X(), X()), Mul(Int(2), X())), Int(1))
+    result = list(quadratic.evaluate_many([0.5, 3], float64=True))
+    assert result == [2.25, 16.0], f"Float batch failed: {result} != [2.25, 16.0]"
+    print(f"✓ {quadratic} at X=0.5, 3 in float64 = {result}")
+
+    # Test: constant trees broadcast to every X value
+    result = list(Int(4).evaluate_many([1, 2, 3]))
+    assert result == [4, 4, 4], f"Constant batch failed: {result} != [4, 4, 4]"
+    print("✓ constant tree broadcasts over X")
+
+    # Test: division by zero is reported like evaluate
+    try:
+        Div(Int(1), X()).evaluate_many([1, 0, 2])
+        assert False, "Batch division by zero did not raise"
+    except ZeroDivisionError:
+        print("✓ division by zero raises ZeroDivisionError")
+
+
+def test_structural_sharing():
+    """Test that structurally equal nodes are the same object"""
+    print("\n=== Testing Structural Sharing ===")
+
+    # Test: building the same tree twice gives the same object
+    first = Add(Mul(X(), X()), Int(1))
+    second = Add(Mul(X(), X()), Int(1))
+    assert first is second, f"Interning failed: {first} built twice"
+    assert first == second and hash(first) == hash(second)
+    print(f"✓ {first} is interned")
+
+    # Test: different structure stays distinct
+    assert Sub(X(), Int(1)) is not Sub(Int(1), X()), "Operand order ignored"
+    assert Add(X(), Int(1)) != Mul(X(), Int(1)), "Operator ignored"
+    assert Int(1) is not Int(True), "Int(True) interned as Int(1)"
+    print("✓ operand order, operator and constant type are distinguished")
+
+    # Test: repeated subtrees are shared, turning the tree into a DAG
+    square = Mul(X(), X())
+    poly = Add(Add(square, Int(2)), Mul(Int(3), Mul(X(), X())))
+    assert poly.p1.p1 is poly.p2.p2, "Repeated subtree not shared"
+    print(f"✓ X * X is shared inside {poly}")
+
+    # Test: nodes carry no per-instance __dict__
+    for node in [X(), Int(1), Add(X(), X()), Div(X(), Int(2))]:
+        assert not hasattr(node, "__dict__"), f"{type(node).__name__} has a __dict__"
+    print("✓ X, Int, Add, Mul, Sub, Div use __slots__")
+
+    # Test: pickling round-trips to the interned node
+    assert pickle.loads(pickle.dumps(poly)) is poly, "Pickle round-trip failed"
+    print("✓ pickle round-trip returns the interned node")
+
+
+def test_canonical_form():
+    """Test conversion to coefficient vectors and Horner evaluation"""
+    print("\n=== Testing Canonical Form ===")
+
+    # Test: (X + 1) * (X - 1) is X² - 1
+    diff_squares = Mul(Add(X(), Int(1)), Sub(X(), Int(1)))
+    coefficients = diff_squares.to_coefficients()
+    assert coefficients == [-1, 0, 1], f"Dense form failed: {coefficients}"
+    sparse = diff_squares.to_coefficients(sparse=True)
+    assert sparse == {0: -1, 2: 1}, f"Sparse form failed: {sparse}"
+    print(f"✓ {diff_squares} -> {coefficients} / {sparse}")
+
+    # Test: Horner evaluation agrees with evaluate
+    nested = Add(Mul(Add(X(), Int(2)), Sub(X(), Int(1))), Mul(X(), Int(3)))
+    dense = DensePolynomial.from_expression(nested)
+    for x_value in [-5, 0, 3, 10**20]:
+        result = dense.evaluate(x_value)
+        expected = nested.evaluate(x_value)
+        assert result.i == expected.i, f"Horner X={x_value}: {result} != {expected}"
+    print(f"✓ {dense} (degree {dense.degree}) matches evaluate")
+
+    # Test: the Horner tree converts back to the same coefficients
+    assert dense.to_expression().to_coefficients() == list(dense.coefficients)
+    print(f"✓ {dense.to_expression()} round-trips")
+
+    # Test: terms cancel down to the zero polynomial
+    cancel = Sub(Mul(X(), X()), Mul(X(), X()))
+    assert cancel.to_coefficients() == [0], "Cancellation failed"
+    print(f"✓ {cancel} -> [0]")
+
+    # Test: exact and constant divisions fold, inexact ones fall back
+    assert Div(Mul(Int(4), X()), Int(2)).to_coefficients() == [0, 2]
+    assert Div(Int(7), Int(2)).to_coefficients() == [3]
+    try:
+        Div(X(), Int(2)).to_coefficients()
+        assert False, "X / 2 converted to a polynomial"
+    except NotPolynomialError:
+        pass
+    mixed = Sub(Add(Mul(Int(2), X()), Int(3)), Div(X(), Int(2)))
+    assert isinstance(mixed.evaluator(), CompiledExpression), "No fallback"
+    assert isinstance(nested.evaluator(), DensePolynomial), "No Horner form"
+    assert mixed.evaluator()(4) == 9, "Fallback evaluator failed"
+    print("✓ Div folds when exact and falls back to compiled code otherwise")
+
+
+def test_polynomial_multiplication():
+    """Test that every multiplication algorithm expands Mul exactly"""
+    print("\n=== Testing Polynomial Multiplication ===")
+
+    # (X + 1) ** 256 by repeated squaring, with binomial coefficients
+    power = Add(X(), Int(1))
+    for _ in range(8):
+        power = Mul(power, power)
+    expected = [comb(256, k) for k in range(257)]
+
+    # Mixed signs and sizes: (X**200 - 3X + 7) * (big coefficients)
+    left = DensePolynomial([7, -3] + [0] * 198 + [1])
+    right = DensePolynomial([(-1) ** k * 10**k for k in range(150)])
+    reference = [0] * 350
+    for i, c in enumerate(left.coefficients):
+        for j, d in enumerate(right.coefficients):
+            reference[i + j] += c * d
+
+    karatsuba, ntt = polynomial.KARATSUBA_THRESHOLD, polynomial.NTT_THRESHOLD
+    try:
+        for label, thresholds in [
+            ("schoolbook", (10**9, 10**9)),
+            ("Karatsuba", (2, 10**9)),
+            ("NTT", (2, 1)),
+        ]:
+            polynomial.KARATSUBA_THRESHOLD, polynomial.NTT_THRESHOLD = thresholds
+            result = power.to_coefficients()
+            assert result == expected, f"{label} (X + 1) ** 256 failed"
+            result = list((left * right).coefficients)
+            assert result == reference, f"{label} mixed product failed"
+            print(f"✓ {label}: (X + 1) ** 256 and a signed product are exact")
+    finally:
+        polynomial.KARATSUBA_THRESHOLD, polynomial.NTT_THRESHOLD = karatsuba, ntt
+
+    # Test: sums and differences of dense polynomials
+    total = DensePolynomial([1, 2]) + DensePolynomial([0, -2, 5])
+    assert total == DensePolynomial([1, 0, 5]), f"Dense addition failed: {total}"
+    difference = DensePolynomial([1, 2]) - DensePolynomial([1, 2])
+    assert difference == DensePolynomial([0]), f"Dense subtraction: {difference}"
+    print(f"✓ dense sum {total} and difference {difference}")
+
+
+def test_parsing():
+    """Test parsing text back into expression trees"""
+    print("\n=== Testing Parsing ===")
+
+    # Test: the precedence cases from test_operator_precedence
+    cases = [
+        ("2 + 3 * 4", 0, 14),
+        ("10 - 2 * 3", 0, 4),
+        ("2 * 3 + 4 * 5", 0, 26),
+        ("20 / 4 + 6 / 2", 0, 8),
+        ("( 2 + 3 ) * ( 4 + 1 )", 0, 25),
+        ("( 10 - 2 ) / ( 3 + 1 )", 0, 2),
+        ("1 + 2 * 3 - 4 / 2", 0, 5),
+        ("2 * X + 3 - X / 2", 4, 9),
+        ("(X+1)*(X-1)", 5, 24),
+        ("X - -3", 1, 4),
+    ]
+    for text, x_value, expected in cases:
+        result = parse(text).evaluate(x_value)
+        assert result.i == expected, f"Parse {text!r} failed: {result} != {expected}"
+        print(f"✓ {text} (X={x_value}) = {result}")
+
+    # Test: parsing the repr of random trees reproduces repr and values
+    rng = random.Random(0)
+
+    def random_expression(depth):
+        if depth == 0 or rng.random() < 0.2:
+            return X() if rng.random() < 0.4 else Int(rng.randint(-5, 5))
+        op = rng.choice([Add, Sub, Mul, Div])
+        return op(random_expression(depth - 1), random_expression(depth - 1))
+
+    for _ in range(500):
+        expr = random_expression(5)
+        parsed = parse(repr(expr))
+        assert repr(parsed) == repr(expr), f"Round-trip failed: {expr}"
+        for x_value in [-3, 2]:
+            try:
+                expected = expr.evaluate(x_value).i
+            except ZeroDivisionError:
+                expected = ZeroDivisionError
+            try:
+                result = parsed.evaluate(x_value).i
+            except ZeroDivisionError:
+                result = ZeroDivisionError
+            assert result == expected, f"Round-trip value failed: {expr}"
+    print("✓ 500 random trees round-trip through repr and parse")
+
+    # Test: Mul and Div operands that would regroup are parenthesized
+    for expr in [
+        Mul(Sub(X(), Int(1)), Int(2)),
+        Mul(Int(8), Div(X(), Int(3))),
+        Mul(Int(8), Mul(Div(X(), Int(3)), Int(2))),
+    ]:
+        assert parse(repr(expr)) is expr, f"Regrouped: {expr}"
+        print(f"✓ {expr} parses back to the same tree")
+
+    # Test: deeply nested text parses without recursion
+    depth = 50000
+    deep = parse("1 - ( " * depth + "X" + " )" * depth)
+    assert deep.evaluate(5).i == 5, "Deep parse failed"
+    print(f"✓ {depth} nested parentheses")
+
+    # Test: malformed text raises ParseError
+    for text in ["", "2 +", "( 2 + 3", "2 + 3 )", "2 3", "2 ^ 3", "-X"]:
+        try:
+            parse(text)
+            assert False, f"Parsed malformed {text!r}"
+        except ParseError:
+            pass
+    print("✓ malformed text raises ParseError")
+
+    # Test: streaming one expression per line
+    stream = io.StringIO("2 + 3 * 4\n\n( X + 1 ) * X\n")
+    parsed = list(parse_lines(stream))
+    assert [repr(expr) for expr in parsed] == ["2 + 3 * 4", "( X + 1 ) * X"]
+    print(f"✓ parse_lines: {parsed}")
+
+
+def test_binary_serialization():
+    """Test the compact binary format and memory-mapped evaluation"""
+    print("\n=== Testing Binary Serialization ===")
+
+    # Test: round-trips, including negative and huge constants
+    square = Mul(Add(X(), Int(-300)), Add(X(), Int(-300)))
+    shared = Add(square, Sub(square, Int(10**30)))
+    exprs = [
+        Add(Add(Int(4), Int(3)), Add(X(), Mul(Int(1), Add(Mul(X(), X()), Int(1))))),
+        Sub(Add(Mul(Int(2), X()), Int(3)), Div(X(), Int(2))),
+        shared,
+        X(),
+        Int(-1),
+    ]
+    for expr in exprs:
+        data = dumps(expr)
+        assert loads(data) is expr, f"Round-trip failed for {expr}"
+        assert len(data) < len(pickle.dumps(expr)), f"Not compact: {expr}"
+    print(f"✓ {len(exprs)} expressions round-trip, each smaller than pickle")
+
+    # Test: a shared subtree is stored once
+    unshared = Add(square, Sub(Mul(Add(X(), Int(-299)), square), Int(10**30)))
+    assert len(dumps(shared)) < len(dumps(unshared)), "Shared subtree repeated"
+    print(f"✓ shared {square} costs {len(dumps(shared))} bytes in {shared}")
+
+    # Test: memory-mapped file evaluated without building nodes
+    with tempfile.NamedTemporaryFile(suffix=".ply", delete=False) as f:
+        dump(exprs, f)
+    try:
+        with ExpressionFile(f.name) as mapped:
+            assert len(mapped) == len(exprs), f"Record count: {len(mapped)}"
+            for x_value in [-2, 0, 5]:
+                result = mapped.evaluate_all(x_value)
+                expected = [expr.evaluate(x_value).i for expr in exprs]
+                assert result == expected, f"Mapped X={x_value}: {result}"
+            assert mapped.evaluate(1, 4) == 9, "Mapped single record failed"
+            assert mapped.expression(2) is shared, "Mapped decode failed"
+        with open(f.name, "rb") as stream:
+            assert list(load(stream)) == exprs, "Streaming load failed"
+    finally:
+        os.unlink(f.name)
+    print(f"✓ memory-mapped file of {len(exprs)} records evaluates in place")
+
+    # Test: damaged input is rejected
+    try:
+        loads(dumps(shared)[:-3])
+        assert False, "Truncated record decoded"
+    except ValueError:
+        pass
+    try:
+        list(load(io.BytesIO(b"not an expression file")))
+        assert False, "Bad header accepted"
+    except ValueError:
+        pass
+    stream = io.BytesIO()
+    dump(exprs, stream)
+    for damaged in [stream.getvalue() + b"\x80", stream.getvalue()[:-1]]:
+        try:
+            list(load(io.BytesIO(damaged)))
+            assert False, "Truncated file loaded"
+        except ValueError:
+            pass
+        with tempfile.NamedTemporaryFile(suffix=".ply", delete=False) as f:
+            f.write(damaged)
+        try:
+            ExpressionFile(f.name)
+            assert False, "Truncated file mapped"
+        except ValueError:
+            pass
+        finally:
+            os.unlink(f.name)
+    print("✓ truncated records and bad headers raise ValueError")
+
+
+def test_simplification():
+    """Test the simplification rules"""
+    print("\n=== Testing Simplification ===")
+
+    cases = [
+        (Add(X(), Int(0)), "X"),
+        (Add(Int(0), X()), "X"),
+        (Add(Int(3), Int(5)), "8"),
+        (Mul(X(), Int(0)), "0"),
+        (Mul(X(), Int(1)), "X"),
+        (Mul(Int(3), Int(5)), "15"),
+        (Sub(X(), Int(0)), "X"),
+        (Sub(Int(5), Int(3)), "2"),
+        (Sub(Mul(X(), X()), Mul(X(), X())), "0"),
+        (Div(X(), Int(1)), "X"),
+        (Div(Int(6), Int(2)), "3"),
+        (Div(Int(6), Int(0)), "6 / 0"),
+        (Add(Add(X(), Int(0)), Mul(Int(2), Int(3))), "X + 6"),
+        (Mul(Add(X(), Int(0)), Sub(Int(4), Int(1))), "X * 3"),
+    ]
+    for expr, expected in cases:
+        result = repr(expr.simplify())
+        assert result == expected, f"Simplify {expr} failed: {result} != {expected}"
+        print(f"✓ {expr} -> {result}")
+
+    # Test: already simple trees are returned unchanged
+    quadratic = Add(Add(Mul(X(), X()), Mul(Int(2), X())), Int(1))
+    assert quadratic.simplify() is quadratic, "Simple tree was rebuilt"
+    print(f"✓ {quadratic} is unchanged")
+
+
+def test_simplify_cache():
+    """Test that simplified subtrees are cached and reused"""
+    print("\n=== Testing Simplify Cache ===")
+
+    maxsize = simplify_cache.maxsize
+    simplify_cache.clear()
+    try:
+        # Test: the first call reduces every operator node once
+        expr = Add(Add(X(), Int(0)), Mul(Int(2), Int(3)))
+        result = expr.simplify()
+        assert simplify_cache.misses == 3, f"Misses: {simplify_cache.stats()}"
+        print(f"✓ {expr} -> {result} with {simplify_cache.misses} misses")
+
+        # Test: a larger tree sharing the subtree reuses its result
+        bigger = Sub(expr, Int(1))
+        assert repr(bigger.simplify()) == "( X + 6 ) - 1", "Cached simplify failed"
+        assert simplify_cache.hits == 1, f"Hits: {simplify_cache.stats()}"
+        print(f"✓ {bigger} reuses the cached {expr}")
+
+        # Test: already reduced results are cached as their own result
+        hits = simplify_cache.hits
+        assert result.simplify() is result, "Reduced tree changed"
+        assert simplify_cache.hits == hits + 1, "Reduced tree re-simplified"
+        print(f"✓ {result} is known to be reduced")
+
+        # Test: the cache is bounded and evicts least recently used entries
+        simplify_cache.resize(2)
+        assert len(simplify_cache) == 2, f"Resize failed: {simplify_cache.stats()}"
+        evictions = simplify_cache.evictions
+        assert evictions > 0, "Resize evicted nothing"
+        Mul(Sub(X(), Int(0)), Int(7)).simplify()
+        assert len(simplify_cache) == 2, "Cache grew past maxsize"
+        assert simplify_cache.evictions > evictions, "No LRU eviction"
+        print(f"✓ bounded to 2 entries: {simplify_cache.stats()}")
+
+        # Test: clear drops entries and counters
+        simplify_cache.clear()
+        stats = simplify_cache.stats()
+        assert stats["size"] == stats["hits"] == stats["misses"] == 0, stats
+        print("✓ clear() resets the cache")
+    finally:
+        simplify_cache.resize(maxsize)
+        simplify_cache.clear()
+
+
+def test_deep_expressions():
+    """Test that repr, evaluate and simplify handle very deep trees"""
+    print("\n=== Testing Deep Expressions ===")
+
+    depth = 100000
+
+    # Test: left-deep X + 1 + 1 + ... + 1
+    left = X()
+    for _ in range(depth):
+        left = Add(left, Int(1))
+    result = left.evaluate(5)
+    assert result.i == depth + 5, f"Left-deep evaluate failed: {result}"
+    assert repr(left) == "X" + " + 1" * depth, "Left-deep repr failed"
+    print(f"✓ left-deep chain of {depth} Add nodes = {result} at X=5")
+
+    # Test: right-deep 1 - ( 1 - ( ... - X ) )
+    right = X()
+    for _ in range(depth):
+        right = Sub(Int(1), right)
+    result = right.evaluate(5)
+    assert result.i == 5, f"Right-deep evaluate failed: {result}"
+    expected = "1 - ( " * (depth - 1) + "1 - X" + " )" * (depth - 1)
+    assert repr(right) == expected, "Right-deep repr failed"
+    print(f"✓ right-deep chain of {depth} Sub nodes = {result} at X=5")
+
+    # Test: simplify folds a deep chain of zeros and ones
+    chain = X()
+    for i in range(depth):
+        chain = Mul(chain, Int(1)) if i % 2 else Add(Int(0), chain)
+    assert chain.simplify() is X(), "Deep simplify failed"
+    print(f"✓ deep chain of {depth} X * 1 and 0 + X nodes simplifies to X")
+
+
+def test_incremental_evaluation():
+    """Test that replacing a subtree re-evaluates only its path to the root"""
+    print("\n=== Testing Incremental Evaluation ===")
+
+    xs = [-3, 0, 1, 7]
+    expr = Add(Mul(Add(X(), Int(2)), Sub(X(), Int(1))), Mul(X(), Int(3)))
+    handle = EditableExpression(expr, xs)
+    assert handle.values() == [expr.evaluate(x).i for x in xs]
+    assert handle.recomputed == 5, f"Initial evaluation failed: {handle.recomputed}"
+    print(f"✓ {expr} at {xs} = {handle.values()}")
+
+    # Test: replacing a leaf recomputes its three ancestors only
+    handle.replace(handle.at(1, 2, 2), Int(5))
+    edited = handle.expression()
+    assert repr(edited) == "( X + 2 ) * ( X - 5 ) + X * 3", f"Edit failed: {edited}"
+    assert handle.values() == [edited.evaluate(x).i for x in xs]
+    assert handle.recomputed == 8, f"Recomputed too much: {handle.recomputed}"
+    print(f"✓ after replacing a leaf: {edited} = {handle.values()}")
+
+    # Test: a deep edit touches the path only, not the whole tree
+    deep = X()
+    for i in range(1000):
+        deep = Add(deep, Int(i))
+    handle = EditableExpression(deep, xs)
+    handle.values()
+    before = handle.recomputed
+    handle.replace(handle.at(*[1] * 500), Mul(X(), X()))
+    expected = Add(Mul(X(), X()), Int(500))
+    assert handle.expression(handle.at(*[1] * 499)) is expected
+    removed = sum(range(500))
+    assert handle.values() == [deep.evaluate(x).i - x - removed + x * x for x in xs]
+    assert handle.recomputed - before == 501, "Deep edit recomputed too much"
+    print("✓ editing at depth 500 of 1000 recomputes 501 nodes")
+
+    # Test: replacing the root
+    handle.replace(handle.root, Int(4))
+    assert handle.values() == [4] * len(xs) and handle.expression() is Int(4)
+    print("✓ replacing the root")
+
+
+def test_common_subexpressions():
+    """Test that ExpressionDAG evaluates each distinct subtree once"""
+    print("\n=== Testing Common Subexpressions ===")
+
+    # Test: X * X appears four times across two expressions
+    square = Mul(X(), X())
+    first = Add(Mul(square, square), Sub(square, Int(3)))
+    second = Mul(Add(square, Int(1)), Int(3))
+    dag = ExpressionDAG([first, second])
+    assert dag.tree_nodes == 20, f"Tree node count failed: {dag.tree_nodes}"
+    assert dag.dag_nodes == 9, f"DAG node count failed: {dag.dag_nodes}"
+    print(f"✓ {dag.tree_nodes} tree nodes share down to {dag.dag_nodes} DAG nodes")
+
+    # Test: values match tree evaluation for single values and arrays
+    xs = [-4, -1, 0, 2, 5]
+    expected = [[expr.evaluate(x).i for x in xs] for expr in (first, second)]
+    assert [dag(x) for x in xs] == [list(row) for row in zip(*expected)]
+    assert dag.evaluate(2) == [first.evaluate(2), second.evaluate(2)]
+    assert [list(row) for row in dag.evaluate_many(xs)] == expected
+    print(f"✓ values at {xs} match tree evaluation")
+
+    # Test: a chain of squarings is exponential as a tree but linear as a DAG
+    chain = Add(X(), Int(1))
+    for _ in range(40):
+        chain = Mul(chain, chain)
+    dag = ExpressionDAG([chain])
+    assert dag.tree_nodes == 2**42 - 1 and dag.dag_nodes == 43
+    assert dag(0) == [1]
+    assert dag(-2) == [1]
+    print(f"✓ 40 squarings: {dag.tree_nodes} tree nodes, {dag.dag_nodes} DAG nodes")
+
+
+def test_parallel_evaluation():
+    """Test evaluating many expressions on a process pool"""
+    print("\n=== Testing Parallel Evaluation ===")
+
+    exprs = [
+        Add(Mul(X(), X()), Int(i)) if i % 2 else Sub(Int(i), Mul(Int(3), X()))
+        for i in range(10)
+    ]
+    xs = list(range(-20, 21))
+    expected = [[expr.evaluate(x).i for x in xs] for expr in exprs]
+
+    # Test: shards of 3 expressions x 8 values on two worker processes
+    result = evaluate_parallel(exprs, xs, processes=2, chunk_size=8)
+    assert [list(row) for row in result] == expected, "Parallel evaluation failed"
+    print(f"✓ {len(exprs)} expressions x {len(xs)} values on 2 processes")
+
+    # Test: in-process evaluation gives the same values
+    result = evaluate_parallel(exprs, xs, processes=1)
+    assert [list(row) for row in result] == expected, "Serial evaluation failed"
+    print("✓ processes=1 evaluates in this process")
+
+    # Test: errors in a worker reach the caller
+    try:
+        evaluate_parallel([Div(Int(1), X())], xs, processes=2, chunk_size=8)
+        assert False, "Division by zero should raise"
+    except ZeroDivisionError:
+        print("✓ ZeroDivisionError raised from a worker")
+
+
+def test_streaming_repr():
+    """Test that write_to and repr_chunks reproduce repr exactly"""
+    print("\n=== Testing Streaming Repr ===")
+
+    exprs = [
+        X(),
+        Int(-7),
+        Mul(Sub(X(), Int(1)), Mul(X(), Div(Int(6), Add(X(), Int(2))))),
+        Sub(Int(1), Sub(X(), Add(Int(2), Mul(X(), X())))),
+    ]
+    for expr in exprs:
+        text = io.StringIO()
+        data = io.BytesIO()
+        length = expr.write_to(text, buffer_size=4)
+        expr.write_to(data)
+        assert text.getvalue() == repr(expr) and length == len(repr(expr))
+        assert data.getvalue() == repr(expr).encode("ascii")
+        assert "".join(expr.repr_chunks()) == repr(expr)
+        print(f"✓ {expr}")
+
+    # Test: a shared tree whose text is far larger than the tree itself
+    expr = Add(X(), Int(1))
+    for _ in range(12):
+        expr = Mul(expr, Sub(expr, Int(2)))
+    text = io.StringIO()
+    length = expr.write_to(text, buffer_size=1000)
+    assert text.getvalue() == repr(expr), "Streaming a shared tree failed"
+    print(f"✓ {length} characters streamed from a 28-node tree")
+
+
+def test_modular_evaluation():
+    """Test evaluation modulo one prime and modulo several with CRT"""
+    print("\n=== Testing Modular Evaluation ===")
+
+    expr = Sub(Mul(Add(X(), Int(3)), Mul(X(), X())), Int(7))
+    for x in [0, -5, 12, 10**40, -(3**200)]:
+        exact = expr.evaluate(x).i
+        assert expr.evaluate_mod(x, 1000003) == exact % 1000003
+        value = expr.evaluate_multimod(x)
+        assert value.to_int() == exact, f"CRT reconstruction failed at X={x}"
+        assert value.modulus > 2 * abs(exact), "Too few primes for an exact result"
+    print(f"✓ {expr} exact through CRT up to X=10^40")
+
+    # Test: Div is exact division, i.e. multiplication by an inverse
+    expr = Div(Mul(X(), Add(X(), Int(4))), X())
+    assert expr.evaluate_mod(7, 101) == 11, "Modular division failed"
+    assert expr.evaluate_multimod(-(10**30)).to_int() == 4 - 10**30
+    print("✓ exact division agrees with // modulo primes")
+
+    # Test: a divisor that is 0 modulo p has no inverse
+    try:
+        expr.evaluate_mod(101, 101)
+        assert False, "Division by a multiple of p should raise"
+    except ZeroDivisionError:
+        print("✓ ZeroDivisionError for a divisor that is 0 mod p")
+
+    # Test: residues for explicit primes, reconstructed only on request
+    value = Mul(X(), X()).evaluate_multimod(10, primes=[7, 11, 13])
+    assert value.residues == [100 % 7, 100 % 11, 100 % 13] and value.to_int() == 100
+    assert ModularValue([7, 11], [3, 5]).to_int() == 38
+    print("✓ explicit primes and symmetric-range reconstruction")
+
+
+def test_multipoint_evaluation():
+    """Test subproduct-tree evaluation at many points against Horner's rule"""
+    print("\n=== Testing Multipoint Evaluation ===")
+
+    rng = random.Random(15)
+    modulus = 2**31 - 1
+    poly = DensePolynomial([rng.randint(-99, 99) for _ in range(300)])
+    xs = [rng.randint(-(10**6), 10**6) for _ in range(700)]
+    expected = [poly(x) for x in xs]
+    assert poly.evaluate_points(xs) == expected, "Exact evaluation failed"
+    assert poly.evaluate_points(xs, modulus) == [v % modulus for v in expected]
+    print(f"✓ degree {poly.degree} at {len(xs)} points, exact and mod 2^31 - 1")
+
+    # Test: small thresholds force trees of several levels and Newton division
+    threshold, block = polynomial.MULTIPOINT_THRESHOLD, polynomial.MULTIPOINT_BLOCK
+    try:
+        polynomial.MULTIPOINT_THRESHOLD, polynomial.MULTIPOINT_BLOCK = 8, 4
+        result = poly.evaluate_points(xs, modulus)
+        assert result == [v % modulus for v in expected], "Tree evaluation failed"
+        assert polynomial._multipoint(poly.coefficients, xs) == expected
+    finally:
+        polynomial.MULTIPOINT_THRESHOLD, polynomial.MULTIPOINT_BLOCK = threshold, block
+    print("✓ subproduct trees with blocks of 4 points, exact and modular")
+
+    # Test: constant polynomials and no points
+    assert DensePolynomial([5]).evaluate_points([1, 2], 3) == [2, 2]
+    assert poly.evaluate_points([], modulus) == []
+    print("✓ constants and empty point lists")
+
+
+def test_profiling():
+    """Test that Profile records evaluate and simplify and then switches off"""
+    print("\n=== Testing Profiling ===")
+
+    expr = Add(Mul(Add(X(), Int(0)), Int(1)), Sub(Int(3), Int(70001)))
+    simplify_cache.clear()
+    with Profile() as profile:
+        simplified = expr.simplify()
+        value = simplified.evaluate(5)
+    assert repr(simplified) == "X + -69998" and value == Int(-69993)
+    stats = profile.to_dict()
+    assert stats["calls"] == {"simplify": 1, "evaluate": 1}, stats["calls"]
+    # simplify visits all 9 nodes, evaluate the 3 of the result
+    assert stats["visits"] == {"Add": 3, "Mul": 1, "Sub": 1, "X": 2, "Int": 5}
+    assert stats["max_depth"] == 4 and stats["cache_misses"] == 4
+    assert stats["allocations"]["Int"] == 2, "Folded -69998 and the value -69993"
+    assert set(stats["node_time"]) == {"Add", "Mul", "Sub"}
+    print(f"✓ {stats['visits']} visits, max depth {stats['max_depth']}")
+
+    # Test: a second simplify is answered by the cache
+    with Profile() as profile:
+        expr.simplify()
+    assert profile.cache_hits == 1 and profile.visits == {"Add": 1}
+    assert json.loads(profile.to_json())["cache_hits"] == 1
+    print("✓ cache hits recorded and exported as JSON")
+
+    # Test: nothing is recorded outside the with block, even after an error
+    division = Div(X(), Int(0))
+    try:
+        with Profile() as profile:
+            division.evaluate(1)
+    except ZeroDivisionError:
+        pass
+    recorded = profile.to_dict()
+    expr.evaluate(2)
+    Int(123457)
+    assert profile.to_dict() == recorded and not profile.allocations
+    try:
+        with Profile(), Profile():
+            pass
+        assert False, "Nested profiles should raise"
+    except RuntimeError:
+        print("✓ profiling switches off on exit and cannot nest")
+
+
+def test_evaluation_server():
+    """Test the asyncio server's answers, batching and compiled-form cache"""
+    print("\n=== Testing Evaluation Server ===")
+
+    from polynomial_server import EvaluationServer, request
+
+    async def scenario():
+        server = EvaluationServer(window=0.05)
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        connections = [
+            await asyncio.open_connection("127.0.0.1", port) for _ in range(3)
+        ]
+        try:
+            # Test: concurrent requests for one expression share a batch
+            results = await asyncio.gather(
+                *(
+                    request(reader, writer, "X * X - 1", [i, i + 10**20])
+                    for i, (reader, writer) in enumerate(connections)
+                )
+            )
+            assert results == [[i * i - 1, (i + 10**20) ** 2 - 1] for i in range(3)]
+            assert server.stats()["batches"] == 1, server.stats()
+            print(f"✓ 3 concurrent requests answered by 1 batch: {results[1]}")
+
+            # Test: a later request reuses the compiled form
+            reader, writer = connections[0]
+            assert await request(reader, writer, "X * X - 1", [4]) == [15]
+            assert server.cache.hits == 1 and server.cache.misses == 1
+            print("✓ compiled form served from the cache")
+
+            # Test: malformed expressions and division by zero become errors
+            for text, xs in [("X +", [1]), ("1 / X", [0])]:
+                try:
+                    await request(reader, writer, text, xs)
+                    assert False, f"{text!r} should fail"
+                except ValueError as e:
+                    print(f"✓ {text!r} at {xs}: {e}")
+        finally:
+            for _, writer in connections:
+                writer.close()
+            listener.close()
+            await listener.wait_closed()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
+
+    async def batches():
+        server = EvaluationServer(window=0.05)
+        # Test: one request's error does not reach the rest of its batch
+        results = await asyncio.gather(
+            server.evaluate("1 / X", [0]),
+            server.evaluate("1 / X", [2, 1]),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], ZeroDivisionError), results
+        assert results[1] == [0, 1] and server.batches == 1, results
+        try:
+            await server.evaluate("(X * X - 1) / (X + 1)", [-1])
+            assert False, "answered at the divisor's root"
+        except ZeroDivisionError:
+            pass
+        print(f"✓ 1 / X at [0] fails alone; [2, 1] in its batch gives {results[1]}")
+
+        # Test: a cancelled waiter does not stop the others being answered
+        cancelled = asyncio.ensure_future(server.evaluate("X + 1", [1]))
+        answered = asyncio.ensure_future(server.evaluate("X + 1", [2]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        assert await answered == [3] and cancelled.cancelled()
+        print("✓ the batch is answered around a cancelled request")
+
+    asyncio.run(batches())
+
+
+def test_derivatives():
+    """Test derivative(), fused value-and-derivative evaluation and newton()"""
+    print("\n=== Testing Derivatives ===")
+
+    # Test: the rules on each node class, with constants folded away
+    assert X().derivative() is Int(1) and Int(7).derivative() is Int(0)
+    assert Mul(Int(3), X()).derivative() is Int(3)
+    assert Sub(X(), Int(4)).derivative() is Int(1)
+    square = parse("X * X")
+    assert repr(square.derivative()) == "X + X"
+    print(f"✓ d/dX {square} = {square.derivative()}")
+
+    # Test: derivative trees agree with the fused pass on every form
+    random.seed(18)
+    exprs = [
+        parse("X * X * X - 2 * X + 5"),
+        parse("(X * X * X - 2 * X + 5) / (X + 1)"),
+        parse("(X - 3) * (X + 2) * (2 * X - 1) / 2"),
+    ]
+    for expr in exprs:
+        derivative = expr.derivative()
+        compiled = expr.compile()
+        evaluator = expr.evaluator()
+        for x in [random.randint(-50, 50) for _ in range(10)] + [10**30]:
+            if x == -1:
+                continue
+            expected = (expr.evaluate(x), derivative.evaluate(x))
+            assert expr.evaluate_with_derivative(x) == expected, (expr, x)
+            assert compiled.value_and_derivative(x) == (expected[0].i, expected[1].i)
+            assert evaluator.value_and_derivative(x) == (expected[0].i, expected[1].i)
+    poly = DensePolynomial([5, -2, 0, 1])
+    assert poly.value_and_derivative(3) == (26, 25)
+    print("✓ fused evaluation matches evaluate() and derivative().evaluate()")
+
+    # Test: exact quotients differentiate exactly
+    quotient = parse("(X * X * X - X) / (X + 1)")  # X * X - X
+    assert all(quotient.derivative().evaluate(x).i == 2 * x - 1 for x in range(5))
+    print("✓ exact quotient differentiated as X * X - X")
+
+    # Test: deep trees differentiate without recursion
+    deep = X()
+    for i in range(5000):
+        deep = Add(Mul(deep, X()), Int(i % 3))
+    assert deep.derivative().evaluate(1).i == deep.evaluate_with_derivative(1)[1].i
+    print("✓ depth 10000 differentiated iteratively")
+
+    # Test: batched Newton, with and without numpy
+    cubic = parse("X * X * X - 2 * X - 5")
+    numpy_module = polynomial.np
+    try:
+        for module in (numpy_module, None):
+            polynomial.np = module
+            roots, converged = newton(cubic, [1, 2, 3, -4, 10])
+            assert all(converged)
+            assert all(abs(r - 2.0945514815423265) < 1e-12 for r in roots)
+            roots, converged = newton(parse("X * X - 2"), [1, -1, 0])
+            assert list(converged) == [True, True, False], "f' vanishes at 0"
+            assert abs(roots[1] + 2**0.5) < 1e-12
+    finally:
+        polynomial.np = numpy_module
+    roots, converged = newton(parse("X / 2 - 3"), [0])
+    assert converged[0] and roots[0] == 6, "Div is true division"
+    roots, converged = newton(Sub(X(), Div(Int(7), Int(2))), [0.0])
+    assert converged[0] and roots[0] == 3.5, "constant Div folded to 3"
+    print(f"✓ newton: {roots[0]} is the root of X / 2 - 3")
+
+
+def test_polynomial_division():
+    """Test divmod of canonical forms and exact Div reduction in simplify"""
+    print("\n=== Testing Polynomial Division ===")
+
+    # Test: classical and Newton division agree and satisfy a = q * b + r
+    rng = random.Random(19)
+    threshold = polynomial.DIVISION_THRESHOLD
+    try:
+        for lead in [1, -1, 3]:
+            b = DensePolynomial([rng.randint(-99, 99) for _ in range(40)] + [lead])
+            q = DensePolynomial([rng.randint(-99, 99) for _ in range(60)])
+            r = DensePolynomial([rng.randint(-99, 99) for _ in range(40)])
+            a = q * b + r
+            results = []
+            for forced in [10**9, 8]:
+                polynomial.DIVISION_THRESHOLD = forced
+                results.append(divmod(a, b))
+            assert results[0] == results[1] == (q, r), f"divmod failed, lead {lead}"
+        # quotient coefficients far beyond a's need the modulus to grow
+        a = DensePolynomial([0] * 80 + [1])
+        b = DensePolynomial([-(10**6)] + [0] * 9 + [1])
+        polynomial.DIVISION_THRESHOLD = 8
+        quotient, remainder = divmod(a, b)
+        assert quotient * b + remainder == a and remainder.degree < b.degree
+    finally:
+        polynomial.DIVISION_THRESHOLD = threshold
+    assert a // b == quotient and a % b == remainder
+    bits = max(quotient.coefficients).bit_length()
+    print(f"✓ classical and Newton divmod agree, up to {bits}-bit quotients")
+
+    # Test: fractional quotients and zero divisors raise
+    for divisor, error in [([1, 2], NotPolynomialError), ([0], ZeroDivisionError)]:
+        try:
+            divmod(DensePolynomial([0, 0, 1]), DensePolynomial(divisor))
+            assert False, f"division by {divisor} should raise"
+        except error:
+            pass
+    print("✓ NotPolynomialError for fractional quotients, ZeroDivisionError for 0")
+
+    # Test: Div of polynomials reduces when the division is exact
+    cases = [
+        ("(X * X - 1) / (X + 1)", "X - 1"),
+        ("(4 * X * X + 2 * X) / (2 * X + 1)", "2 * X"),
+        ("(4 * X + 6) / 2", "2 * X + 3"),
+        ("(4 * X + 3) / 2", "( 4 * X + 3 ) / 2"),
+        ("(X * X + 1) / (X + 1)", "( X * X + 1 ) / ( X + 1 )"),
+        ("(X * X + X) / (2 * X + 2)", "( X * X + X ) / ( 2 * X + 2 )"),
+        ("X / (X / 2)", "X / ( X / 2 )"),
+    ]
+    for text, expected in cases:
+        simplified = parse(text).simplify()
+        assert repr(simplified) == expected, f"{text} -> {simplified}"
+        print(f"✓ {text} -> {simplified}")
+    exact = parse("(X * X * X - X) / (X * X + X)")
+    assert exact.simplify().to_coefficients() == [-1, 1]
+    assert all(exact.evaluate(x) == exact.simplify().evaluate(x) for x in range(1, 9))
+    print("✓ the quotient agrees with // wherever the divisor is nonzero")
+
+    # Test: evaluation still divides by zero at the divisor's roots
+    for expr, root in [(exact, 0), (Div(Mul(X(), X()), X()), 0)]:
+        try:
+            expr.to_coefficients()
+            assert False, f"{expr} folded into a polynomial"
+        except NotPolynomialError:
+            pass
+        for evaluate in (expr.evaluate, expr.evaluator()):
+            try:
+                evaluate(root)
+                assert False, f"{expr} at {root} did not raise"
+            except ZeroDivisionError:
+                pass
+    print("✓ evaluator() raises ZeroDivisionError at the divisor's roots")
+
+    # Test: the operand sizes kept while simplifying hold no nodes alive
+    simplify_cache.clear()
+    live = len(polynomial._interned)
+    tree = X()
+    for i in range(200):
+        tree = Add(Div(tree, Add(X(), Int(i + 2))), Int(i))
+    tree.simplify()
+    del tree
+    simplify_cache.clear()
+    assert len(polynomial._interned) <= live, len(polynomial._interned) - live
+    print("✓ simplifying 200 Divs leaves no nodes behind")
+
+
+def test_exact_fast_path():
+    """Test that checked int64 evaluation falls back to Python ints exactly"""
+    print("\n=== Testing Exact Fast Path ===")
+
+    limit = 2**63
+    rng = random.Random(20)
+    exprs = [
+        parse("X * X * X - 3037000499 * X + 7"),
+        parse("(X * X + 5) / (X - 3) - X"),
+        Sub(Mul(X(), X()), Int(-limit)),
+        Div(Int(-limit), X()),
+        Add(Mul(X(), Int(10**30)), X()),  # constants beyond int64
+    ]
+    xs = [0, 1, -1, limit - 1, -limit, limit, -limit - 1, 3037000500, -(2**70)]
+    xs += [
+        rng.randint(-(2 ** rng.randint(1, 66)), 2 ** rng.randint(1, 66))
+        for _ in range(300)
+    ]
+    for expr in exprs:
+        points = [x for x in xs if x != 3 and (x or not isinstance(expr, Div))]
+        expected = [expr.evaluate(x).i for x in points]
+        assert expr.evaluate_exact(points, chunk_size=64) == expected, expr
+        assert expr.compile().evaluate_exact(points) == expected, expr
+    print(f"✓ {len(exprs)} expressions bit-identical at {len(xs)} points")
+
+    # Test: the boundary cases each operation has to catch
+    boundaries = [
+        ("X + 1", limit - 1),
+        ("X - 1", -limit),
+        ("0 - X", -limit),
+        ("X * X", 3037000500),
+        ("X * (0 - 1)", -limit),
+        ("X / (0 - 1)", -limit),
+    ]
+    for text, x in boundaries:
+        expr = parse(text)
+        assert expr.evaluate_exact([x]) == [expr.evaluate(x).i], text
+    assert parse("X * X").evaluate_exact([3037000499]) == [3037000499**2]
+    print("✓ wrap-around caught for +, -, *, / at the int64 limits")
+
+    # Test: Horner form through evaluate_points, division by zero raises
+    poly = DensePolynomial([1, 2, 3])
+    assert poly.evaluate_points(range(5)) == [1, 6, 17, 34, 57]
+    try:
+        parse("1 / (X - 3)").evaluate_exact([1, 2, 3])
+        assert False, "Division by zero should raise"
+    except ZeroDivisionError:
+        print("✓ ZeroDivisionError where evaluate() raises it")
+
+    # Test: X values int64 cannot hold are not wrapped or truncated
+    expr = Add(X(), Int(1))
+    xs = [2**64 - 1, 2**63, 5, 2.0, 1e20]
+    assert expr.evaluate_exact(xs) == [expr.evaluate(int(x)).i for x in xs]
+    np = polynomial.np
+    if np is not None:
+        unsigned = np.array([2**64 - 1, 5], dtype=np.uint64)
+        assert expr.evaluate_exact(unsigned) == [2**64, 6]
+        assert expr.evaluate_exact(np.array([2.0, 1e20])) == [3, 10**20 + 1]
+    for fractional in ([2.5], [1, 2.5]):
+        try:
+            expr.evaluate_exact(fractional)
+            assert False, f"{fractional} truncated"
+        except TypeError:
+            pass
+    print("✓ uint64 and float X values stay exact; fractions raise TypeError")
+
+    # Test: the pure-Python fallback
+    numpy_module = polynomial.np
+    try:
+        polynomial.np = None
+        assert exprs[0].evaluate_exact([limit, 2]) == [
+            exprs[0].evaluate(x).i for x in [limit, 2]
+        ]
+        try:
+            expr.evaluate_exact([2.5])
+            assert False, "2.5 truncated without numpy"
+        except TypeError:
+            pass
+    finally:
+        polynomial.np = numpy_module
+    print("✓ pure-Python fallback without numpy")
+
+
+def test_quiet_import():
+    """Test that importing polynomial prints nothing and starts no pools"""
+    print("\n=== Testing Quiet Import ===")
+
+    script = (
+        "import sys, polynomial; "
+        "print('concurrent.futures.process' in sys.modules, len(polynomial._interned))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "False 0\n" and not result.stderr, result
+    print("✓ import prints nothing, builds no nodes and defers the process pool")
+
+
+def test_arena():
+    """Test the column arena against the node classes"""
+    print("\n=== Testing Expression Arena ===")
+
+    # Test: building on handles directly
+    arena = ExpressionArena()
+    x = arena.x()
+    root = arena.add(arena.mul(x, x), arena.constant(1))
+    assert arena.evaluate(root, 3) == 10 and len(arena) == 4
+    assert arena.expression(root) is Add(Mul(X(), X()), Int(1))
+    assert arena.bytes_per_node == 17
+    print(f"✓ {arena.expression(root)} in {len(arena)} nodes, 17 bytes each")
+
+    # Test: round trips and evaluation agree with the classes
+    big = Int(-(10**30))
+    exprs = [
+        Sub(Mul(Add(X(), Int(3)), Add(X(), Int(3))), Div(X(), Int(2))),
+        Add(Mul(big, X()), Sub(X(), X())),
+        Mul(Add(Mul(X(), Int(1)), Int(0)), Sub(Int(8), Div(Int(6), Int(2)))),
+    ]
+    for expr in exprs:
+        handle = arena.insert(expr)
+        assert arena.expression(handle) is expr
+        assert arena.evaluate(handle, 7) == expr.evaluate(7).i
+        assert arena.expression(arena.simplify(handle)) is expr.simplify(), expr
+    assert list(arena.evaluate_many(arena.insert(exprs[0]), [1, 2, 3])) == [
+        exprs[0].evaluate(x).i for x in [1, 2, 3]
+    ]
+    by_zero = arena.insert(Div(Int(6), Int(0)))
+    assert arena.simplify(by_zero) == by_zero, "division by zero is left alone"
+    print("✓ insert/expression round trip, evaluate and simplify match")
+
+    # Test: shared subtrees are stored once, and unchanged nodes kept
+    size = len(arena)
+    square = arena.insert(Mul(Add(X(), Int(1)), Add(X(), Int(1))))
+    assert len(arena) == size + 3, "X is shared, X + 1 stored once"
+    assert arena.simplify(square) == square and len(arena) == size + 3
+    print("✓ distinct nodes stored once, simplify appends only changes")
+
+    # Test: deep chains without recursion
+    deep = arena.x()
+    for i in range(100000):
+        deep = arena.sub(arena.add(deep, arena.constant(i % 5)), arena.constant(1))
+    assert arena.evaluate(deep, 0) == sum(i % 5 - 1 for i in range(100000))
+    assert arena.evaluate(arena.simplify(deep), 0) == arena.evaluate(deep, 0)
+    print(f"✓ depth 200000 evaluated and simplified in {len(arena)} nodes")
+
+    # Test: a small expression late in a large arena visits only its nodes
+    late = arena.mul(arena.add(x, arena.constant(2)), x)
+    order, reads = arena._schedule(late)
+    assert len(order) == 4 and reads[x] == 2, (order, reads)
+    assert arena.evaluate(late, 5) == 35
+    print(f"✓ handle {late} schedules its {len(order)} reachable nodes only")
+
+
 def run_all_tests():
     """Run all test suites"""
     print("🧪 Starting Comprehensive Polynomial Test Suite")
@@ -341,6 +1457,223 @@ def run_all_tests():
             print("   💡 This test requires Sub and Div class implementations")
         total_tests += 1
 
+        # Test compiled evaluation (needs evaluate methods)
+        print("\n🔍 Testing compiled evaluation...")
+        try:
+            test_compiled_evaluation()
+            print("✅ Compiled evaluation: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Compiled evaluation: FAILED - {e}")
+        total_tests += 1
+
+        # Test batch evaluation (needs evaluate methods)
+        print("\n🔍 Testing batch evaluation...")
+        try:
+            test_batch_evaluation()
+            print("✅ Batch evaluation: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Batch evaluation: FAILED - {e}")
+        total_tests += 1
+
+        # Test structural sharing
+        print("\n🔍 Testing structural sharing...")
+        try:
+            test_structural_sharing()
+            print("✅ Structural sharing: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Structural sharing: FAILED - {e}")
+        total_tests += 1
+
+        # Test canonical form (needs evaluate methods)
+        print("\n🔍 Testing canonical form...")
+        try:
+            test_canonical_form()
+            print("✅ Canonical form: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Canonical form: FAILED - {e}")
+        total_tests += 1
+
+        # Test polynomial multiplication
+        print("\n🔍 Testing polynomial multiplication...")
+        try:
+            test_polynomial_multiplication()
+            print("✅ Polynomial multiplication: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Polynomial multiplication: FAILED - {e}")
+        total_tests += 1
+
+        # Test parsing
+        print("\n🔍 Testing parsing...")
+        try:
+            test_parsing()
+            print("✅ Parsing: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Parsing: FAILED - {e}")
+        total_tests += 1
+
+        # Test binary serialization
+        print("\n🔍 Testing binary serialization...")
+        try:
+            test_binary_serialization()
+            print("✅ Binary serialization: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Binary serialization: FAILED - {e}")
+        total_tests += 1
+
+        # Test simplification (Exercise 3)
+        print("\n🔍 Testing simplification...")
+        try:
+            test_simplification()
+            print("✅ Simplification: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Simplification: FAILED - {e}")
+        total_tests += 1
+
+        # Test simplify cache
+        print("\n🔍 Testing simplify cache...")
+        try:
+            test_simplify_cache()
+            print("✅ Simplify cache: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Simplify cache: FAILED - {e}")
+        total_tests += 1
+
+        # Test deep expressions
+        print("\n🔍 Testing deep expressions...")
+        try:
+            test_deep_expressions()
+            print("✅ Deep expressions: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Deep expressions: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing incremental evaluation...")
+        try:
+            test_incremental_evaluation()
+            print("✅ Incremental evaluation: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Incremental evaluation: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing common subexpressions...")
+        try:
+            test_common_subexpressions()
+            print("✅ Common subexpressions: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Common subexpressions: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing parallel evaluation...")
+        try:
+            test_parallel_evaluation()
+            print("✅ Parallel evaluation: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Parallel evaluation: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing streaming repr...")
+        try:
+            test_streaming_repr()
+            print("✅ Streaming repr: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Streaming repr: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing modular evaluation...")
+        try:
+            test_modular_evaluation()
+            print("✅ Modular evaluation: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Modular evaluation: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing multipoint evaluation...")
+        try:
+            test_multipoint_evaluation()
+            print("✅ Multipoint evaluation: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Multipoint evaluation: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing profiling...")
+        try:
+            test_profiling()
+            print("✅ Profiling: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Profiling: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing evaluation server...")
+        try:
+            test_evaluation_server()
+            print("✅ Evaluation server: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Evaluation server: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing derivatives...")
+        try:
+            test_derivatives()
+            print("✅ Derivatives: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Derivatives: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing polynomial division...")
+        try:
+            test_polynomial_division()
+            print("✅ Polynomial division: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Polynomial division: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing exact fast path...")
+        try:
+            test_exact_fast_path()
+            print("✅ Exact fast path: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Exact fast path: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing quiet import...")
+        try:
+            test_quiet_import()
+            print("✅ Quiet import: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Quiet import: FAILED - {e}")
+        total_tests += 1
+
+        print("\n🔍 Testing expression arena...")
+        try:
+            test_arena()
+            print("✅ Expression arena: PASSED")
+            passed_tests += 1
+        except Exception as e:
+            print(f"❌ Expression arena: FAILED - {e}")
+        total_tests += 1
+
         print("\n" + "=" * 60)
         print(f"📊 TEST RESULTS: {passed_tests}/{total_tests} test suites passed")
 